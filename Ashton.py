@@ -2,15 +2,18 @@ import board # type: ignore
 import neopixel # type: ignore
 import time # type: ignore
 import analogio # type: ignore
-from digitalio import DigitalInOut, Direction, Pull # type: ignore
+from inputs import Buttons, CLICK, DOUBLE_CLICK
+from effects import Scheduler, Reveal
+from output import Output
+import pixbuf
+import telemetry
+from telemetry import Telemetry
 
-switch = DigitalInOut(board.D3)
-switch.direction = Direction.INPUT
-switch.pull = Pull.UP
-lastState = True
 override = False
-clickTime = 0
 clickInterval = 0.5
+# switch on D3 is scanned + debounced in the background, so presses made
+# while defMode() is running are still seen afterwards
+buttons = Buttons((board.D3,), clickInterval)
 
 photocell_pin = board.A2  #pin 0 is Analog input 2 
 photocell = analogio.AnalogIn(photocell_pin)
@@ -21,6 +24,11 @@ num_pixels = 8        #number of leds pixels on the ring
  
 pixels = neopixel.NeoPixel(pixel_pin, num_pixels, brightness=0.3, auto_write=False)
 pixelState = False
+skippedUpdates = 0  # loop passes where the lights were already right
+
+# readings go into a binary ring, flushed in bulk while nothing is
+# changing, instead of a print() every loop (decode with sim/decode.py)
+tlm = Telemetry(128, idle_period=2.0)
 
 RED = (255, 0, 0) # RGB
 YELLOW = (255, 150, 0)
@@ -34,82 +42,25 @@ CUSTRD = (255, 30, 30)
 WHITE = (255, 255, 100)
 
 
+# one pixel at a time: 6 s dark, then a 6 s fade in, 0.1 s per step
+revealDelay = 0.1
+revealColors = (CUSTRD, WHITE, WHITE, WHITE, CUSTYL, WHITE, WHITE, WHITE)
+out = Output(pixels, num_pixels)
+frame = pixbuf.frame(num_pixels)
+reveal = Reveal(out, frame, revealColors, 60, 60, revealDelay)
+fx = Scheduler()  # plays the reveal one step per loop, so the switch stays live
+
 def defMode():
-    B1 = 0
-    B2 = 0
-    B3 = 0
-    for i in range(num_pixels):
-        if i == 0:
-            C1 = B1
-            C2 = B2
-            C3 = B3
-            for j in range(60):
-                B1 = B1 - C1* 1 / 60
-                B2 = B2 - C2 * 1 / 60
-                B3 = B3 - C3 * 1 / 60
-                pixels[i] = (int(B1), int(B2), int(B3))
-                time.sleep(0.1)
-                pixels.show()
-            pixels[i] = OFF
-            pixels.show()
-            for j in range(60):
-                B1 = B1 + int(CUSTRD[0]) * 1 / 60
-                B2 = B2 + int(CUSTRD[1]) * 1 / 60
-                B3 = B3 + int(CUSTRD[2]) * 1 / 60
-                pixels[i] = (int(B1), int(B2), int(B3))
-                time.sleep(0.1)
-                pixels.show()
-        elif i == 4:
-            C1 = B1
-            C2 = B2
-            C3 = B3
-            for j in range(60):
-                B1 = B1 - C1* 1 / 60
-                B2 = B2 - C2 * 1 / 60
-                B3 = B3 - C3 * 1 / 60
-                pixels[i] = (int(B1), int(B2), int(B3))
-                time.sleep(0.1)
-                pixels.show()
-            pixels[i] = OFF
-            pixels.show()
-            for j in range(60):
-                B1 = B1 + int(CUSTYL[0]) * 1 / 60
-                B2 = B2 + int(CUSTYL[1]) * 1 / 60
-                B3 = B3 + int(CUSTYL[2]) * 1 / 60
-                pixels[i] = (int(B1), int(B2), int(B3))
-                time.sleep(0.1)
-                pixels.show()
-        else:
-            C1 = B1
-            C2 = B2
-            C3 = B3
-            for j in range(60):
-                B1 = B1 - C1* 1 / 60
-                B2 = B2 - C2 * 1 / 60
-                B3 = B3 - C3 * 1 / 60
-                pixels[i] = (int(B1), int(B2), int(B3))
-                time.sleep(0.1)
-                pixels.show()
-            pixels[i] = OFF
-            pixels.show()
-            for j in range(60):
-                B1 = B1 + int(WHITE[0]) * 1 / 60
-                B2 = B2 + int(WHITE[1]) * 1 / 60
-                B3 = B3 + int(WHITE[2]) * 1 / 60
-                pixels[i] = (int(B1), int(B2), int(B3))
-                time.sleep(0.1)
-                pixels.show()
-        B1 = 0
-        B2 = 0
-        B3 = 0
-    
-    pixels.show()
+    out.invalidate()  # off() and photoAlert() write the pixels directly
+    fx.play(reveal)
 
 def off():
+    fx.cancel()
     pixels.fill(OFF)
     pixels.show()
 
 def photoAlert():
+    fx.cancel()
     if photocellEnabled:
         for i in range(2):
             pixels.fill(WHITE)
@@ -128,35 +79,45 @@ def photoAlert():
             time.sleep(0.1)
 
 while True:
-    currentState = switch.value
+    now = time.monotonic()
+    buttons.poll(now)
+    fx.tick(now)
 
-    # Print states
-    # print("Last: " + str(lastState) + " Current: "+ str(currentState) + " Button: " + str(override))
-    print(">value:" + str(photocell.value) + "\r\n")
+    # Log states
+    light = photocell.value
+    tlm.log(telemetry.PHOTO_RAW, light)
 
-    if lastState and not currentState:  # Button press detected
-        timeNow = time.monotonic()
-        if timeNow - clickTime < clickInterval:  # Double-click detected
+    event = buttons.get()
+    while event:
+        kind = event[0]
+        event = buttons.get()
+        if kind == DOUBLE_CLICK:
             photocellEnabled = not photocellEnabled
-            print("Photocell toggled: " + str(photocellEnabled))
+            tlm.log(telemetry.PHOTOCELL, photocellEnabled)
             photoAlert()
-            clickTime = 0  # Reset clickTime to avoid triggering override
-        else:
-            clickTime = timeNow
-
-    if clickTime and (time.monotonic() - clickTime >= clickInterval):  
-        # Single click timeout, toggle override
-        override = not override
-        clickTime = 0  # Reset clickTime after processing single click
+            pixelState = False  # photoAlert() leaves the pixels off
+        elif kind == CLICK:
+            # Single click timeout, toggle override
+            override = not override
+            tlm.log(telemetry.OVERRIDE, override)
 
-    # Only update lights if not in the middle of a double-click
-    if not clickTime:
-        if override:
+    # Only update lights if not in the middle of a double-click,
+    # and only when the wanted state changes: defMode() starts the
+    # reveal, re-starting it would throw away its progress
+    if not buttons.pending(0):
+        wantOn = override or (light < 35000 and photocellEnabled)
+        if wantOn and not pixelState:
+            tlm.log(telemetry.SKIPPED, skippedUpdates)  # once per change, not per idle pass
+            tlm.log(telemetry.LIGHTS, 1)
             defMode()
-        elif photocell.value < 35000 and photocellEnabled:
-            defMode()
-        else:
+            pixelState = True
+        elif not wantOn and pixelState:
+            tlm.log(telemetry.SKIPPED, skippedUpdates)
+            tlm.log(telemetry.LIGHTS, 0)
             off()
+            pixelState = False
+        else:
+            skippedUpdates += 1
+            tlm.poll(now, idle=not fx.busy)
 
-    lastState = currentState
-    time.sleep(0.12)
+    time.sleep(revealDelay)
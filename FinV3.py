@@ -2,7 +2,12 @@ import board
 import neopixel
 import time
 import analogio
-from digitalio import DigitalInOut, Direction, Pull
+from effects import Scheduler, Blink
+from inputs import Buttons, CLICK, DOUBLE_CLICK, TENTATIVE_CLICK, CANCEL_CLICK
+from output import Output
+import pixbuf
+import telemetry
+from telemetry import Telemetry
 
 # --- Configuration Constants ---
 SWITCH_PIN = board.D3
@@ -13,6 +18,7 @@ NUM_PIXELS = 8
 PIXEL_BRIGHTNESS = 0.1 # Lowered brightness for testing, reduces power draw
 
 CLICK_INTERVAL = 0.5  # Seconds to distinguish single/double click
+SPECULATIVE_CLICK = True  # Toggle override on the press, toggle it back if it becomes a double click
 MAIN_LOOP_DELAY = 0.1 # Seconds, affects responsiveness and loop frequency
 
 PHOTOCELL_THRESHOLD = 35000  # ADC value, lower means darker
@@ -23,6 +29,8 @@ ALERT_OFF_TIME = 0.1
 ALERT_REPETITIONS = 2 # Number of ON-OFF cycles for the alert
 
 DEBUG_PRINT = False # Set to True for verbose debug console output
+TLM_RECORDS = 128 # Per-loop debug state is logged here as binary records, see sim/decode.py
+TLM_FLUSH_PERIOD = 2.0 # Seconds between bulk flushes while the LEDs are idle
 
 # --- Color Definitions (Simplified) ---
 # Using dim colors to reduce power draw
@@ -33,22 +41,22 @@ ALERT_COLOR_PHOTOCELL_DISABLED = (30, 30, 0) # Dim Yellow
 
 
 # --- Hardware Setup ---
-# Switch
-switch = DigitalInOut(SWITCH_PIN)
-switch.direction = Direction.INPUT
-switch.pull = Pull.UP
+# Switch (scanned, debounced and timestamped in the background by keypad)
+buttons = Buttons((SWITCH_PIN,), CLICK_INTERVAL, speculative=SPECULATIVE_CLICK)
 
 # Photocell
 photocell = analogio.AnalogIn(PHOTOCELL_PIN)
 
 # NeoPixels
 pixels = neopixel.NeoPixel(PIXEL_PIN, NUM_PIXELS, brightness=PIXEL_BRIGHTNESS, auto_write=False)
+out = Output(pixels, NUM_PIXELS) # Skips show() when the frame hasn't changed
+alert_frame = pixbuf.frame(NUM_PIXELS)
+fx = Scheduler() # Runs the alert one frame per loop instead of sleeping
+tlm = Telemetry(TLM_RECORDS, idle_period=TLM_FLUSH_PERIOD)
 
 # --- Global State Variables ---
-last_switch_state = True
 override_mode_active = False
 photocell_control_enabled = True
-click_time = 0
 leds_currently_on = False # Tracks if the simple pattern is physically displayed
 
 # --- LED Effect Functions (Simplified) ---
@@ -73,24 +81,19 @@ def set_pixels_off():
     if DEBUG_PRINT: print("LEDs: All OFF")
 
 def photoAlert():
-    """Flashes pixels to indicate a mode change."""
+    """Starts the flash that indicates a mode change; fx.tick() plays it."""
     global leds_currently_on
     if DEBUG_PRINT: print("PhotoAlert: Starting...")
 
     alert_color = ALERT_COLOR_PHOTOCELL_ENABLED if photocell_control_enabled else ALERT_COLOR_PHOTOCELL_DISABLED
 
-    for _ in range(ALERT_REPETITIONS):
-        pixels.fill(alert_color)
-        pixels.show()
-        time.sleep(ALERT_ON_TIME)
-        pixels.fill(OFF_COLOR)
-        pixels.show()
-        time.sleep(ALERT_OFF_TIME)
+    out.invalidate() # set_simple_pattern_on()/set_pixels_off() write the strip directly
+    fx.play(Blink(out, alert_frame, alert_color, OFF_COLOR, ALERT_REPETITIONS, ALERT_ON_TIME, ALERT_OFF_TIME))
 
-    # After the alert, the LEDs are physically off.
+    # Once the alert has played, the LEDs are physically off.
     # Update our state tracking variable. The main loop will decide the next state.
     leds_currently_on = False
-    if DEBUG_PRINT: print("PhotoAlert: Finished. LEDs left off, leds_currently_on = False.")
+    if DEBUG_PRINT: print("PhotoAlert: Queued. LEDs will be left off, leds_currently_on = False.")
 
 # --- Main Loop ---
 if DEBUG_PRINT: print("Device starting... Initializing LEDs to OFF.")
@@ -100,34 +103,30 @@ leds_currently_on = False
 
 while True:
     current_time = time.monotonic()
-    current_switch_state = switch.value
+    buttons.poll(current_time)
     photocell_value = photocell.value
 
     if DEBUG_PRINT:
-        print("Loop: Time={:.2f}, Switch={}, LastSw={}, Override={}, PCtrl={}, PCval={}, ClickT={:.2f}, LEDsOn={}".format(
-            current_time, current_switch_state, last_switch_state, override_mode_active,
-            photocell_control_enabled, photocell_value, click_time, leds_currently_on
-        ))
-
-    # --- Button Press Detection (Falling Edge: True to False) ---
-    if last_switch_state and not current_switch_state:
-        if DEBUG_PRINT: print("Button Press Detected (Falling Edge)")
-        if click_time > 0 and (current_time - click_time) < CLICK_INTERVAL:
+        # STATE bits: override, photocell control, click pending, LEDs on
+        tlm.log(telemetry.PHOTO_RAW, photocell_value)
+        tlm.log(telemetry.STATE, override_mode_active | photocell_control_enabled << 1
+                | buttons.pending(0) << 2 | leds_currently_on << 3)
+
+    # --- Button Events (drained from the queue filled by keypad) ---
+    event = buttons.get()
+    while event:
+        kind = event[0]
+        event = buttons.get()
+        if kind == DOUBLE_CLICK:
             photocell_control_enabled = not photocell_control_enabled
             if DEBUG_PRINT:
-                print("Double-click: photocell_control_enabled toggled to {}".format(photocell_control_enabled))
+                tlm.log(telemetry.PHOTOCELL, photocell_control_enabled)
             photoAlert() # This will leave LEDs off and set leds_currently_on=False
-            click_time = 0
-        else:
-            click_time = current_time
-            if DEBUG_PRINT: print("First click registered at {:.2f}".format(click_time))
-
-    # --- Single Click Timeout Detection ---
-    if click_time > 0 and (current_time - click_time) >= CLICK_INTERVAL:
-        override_mode_active = not override_mode_active
-        if DEBUG_PRINT:
-            print("Single-click: override_mode_active toggled to {}".format(override_mode_active))
-        click_time = 0
+        elif kind == TENTATIVE_CLICK or kind == CANCEL_CLICK or (kind == CLICK and not SPECULATIVE_CLICK):
+            # a cancel undoes the tentative toggle before the double click lands
+            override_mode_active = not override_mode_active
+            if DEBUG_PRINT:
+                tlm.log(telemetry.OVERRIDE, override_mode_active)
 
     # --- LED Control Logic ---
     # Determine if LEDs *should* be on based on the current mode states
@@ -138,12 +137,17 @@ while True:
         should_leds_be_on_now = True
 
     # Update physical LEDs only if the desired state differs from the current physical state
-    if should_leds_be_on_now:
+    # (the alert owns the pixels until it has finished playing)
+    if fx.tick(current_time):
+        pass
+    elif should_leds_be_on_now:
         if not leds_currently_on: # If they should be on, but are currently physically off
             set_simple_pattern_on()
     else: # They should be off
         if leds_currently_on: # If they should be off, but are currently physically on
             set_pixels_off()
 
-    last_switch_state = current_switch_state
+    if DEBUG_PRINT:
+        tlm.poll(current_time, idle=not fx.busy)
+
     time.sleep(MAIN_LOOP_DELAY)
@@ -8,9 +8,20 @@ import time
 import gc
 
 import board
-import neopixel
-import analogio
-from digitalio import DigitalInOut, Direction, Pull
+import microcontroller
+
+from effects import Scheduler, Fade, Crossfade, Blink
+import pixbuf
+from vecbuf import fill, set_pixel  # whole-array ops on long strips
+from palette import Palette
+from bake import FrameCache
+from multistrip import StripSet
+from tone import ToneMap
+from gcpolicy import GCPolicy
+from anim import AnimClock
+from governor import FrameGovernor
+from inputs import Buttons, LatencyMeter, PRESS, CLICK, DOUBLE_CLICK, TENTATIVE_CLICK, CANCEL_CLICK, NAMES
+from photo import PhotoFilter, BufferedPhotocell, Calibrator
 
 # ────────────────────── CONFIG ────────────────────────────────
 DEBUG = True  # ← set True to see diagnostics
@@ -29,26 +40,89 @@ else:
 M_SWITCH_PIN = board.D4  # momentary switch (pull-up)
 L_SWITCH_PIN = board.D1  # latching  switch (pull-up)
 PHOTOCELL_PIN = board.A2
-NEOPIXEL_PIN = board.D2
+NEOPIXEL_PIN = board.D2  # interior strip
 
 NUM_PIXELS = 8
+# Further chains, rendered with the interior strip: (name, pin, pixels, mode)
+# e.g. (("sign", board.D3, 24, "Default"), ("markers", board.D0, 4, "Static Orange"))
+EXTRA_STRIPS = ()
+PARALLEL_TX = False  # True → every strip a NeoPxl8 strand, sent at once (consecutive pins from NEOPIXEL_PIN)
+TX_TIMING = False  # time every transmission (overlap / peak fps stats; costs two clock reads per show)
 DOUBLE_CLICK_WINDOW = 0.25  # s
+LONG_PRESS_TIME = 1.0  # s
+DEBOUNCE_TIME = 0.02  # s, keypad scan interval
+SPECULATIVE_CLICK = True  # advance the mode on the press, undo it if a double-click follows
 
-PHOTO_ON_THRESHOLD = 8000
+PHOTO_ON_THRESHOLD = 8000  # until auto-calibration has learned better
 PHOTO_OFF_THRESHOLD = 9000
+PHOTO_AUTO_CAL = True  # learn the band from day / night levels
+CAL_PERIOD = 10.0  # s between calibration samples
+CAL_SAVE_PERIOD = 3600.0  # s between nvm writes
+PHOTO_SAMPLE_PERIOD = 0.20  # s between filtered photocell samples
+PHOTO_BLOCK = 64  # ADC conversions per sample, read in one call
+PHOTO_BLOCK_RATE = 12800  # Hz → a 5 ms block
+PHOTO_MEDIAN = 5  # samples in the running median
+PHOTO_EMA_SHIFT = 2  # EMA weight 1/4 after the median
 
 ALERT_BLINKS = 3
 ALERT_BLINK_TIME = 0.10  # s
 
-RAINBOW_SPEED = 1  # wheel step / loop
+ANIM_FPS = 60  # animation frames / s, independent of the loop rate
+ANIM_MAX_LAG = 0.10  # s; longer stalls pause the animation instead of jumping
+FX_FPS = 100  # loop rate while a fade, crossfade or blink plays
+# s; switches and photocell are polled at least this often. A press waits
+# up to one period to be seen: 0.02 keeps press-to-photon where the fixed
+# 10 ms sleep had it (≈ 22 ms mean), 0.05 adds ≈ 13 ms for fewer wake-ups
+LOOP_MAX_PERIOD = 0.02
+
+RAINBOW_SPEED = 100  # wheel steps / s
 
 BREATH_MIN = 0.10
 BREATH_MAX = 1.00
-BREATH_STEP = 0.02
+BREATH_SPEED = 2.0  # intensity / s (≈ 0.45 s from dim to full, 0.9 s per breath)
+BREATH_GAMMA = 2.2  # built into the breathe palette: even steps near BREATH_MIN, other colours untouched
+
+GAMMA = 1.0  # output gamma correction (1.0 = off; 2.2 re-tints the colours below, CUST_YL → (255, 79, 1))
+BRIGHTNESS = 1.0  # global brightness, applied with gamma in one table
+DITHER = False  # temporal dithering of the dimmest levels (a per-byte loop, and frames holding them re-send every loop)
+
+BAKE_MODES = False  # play periodic modes back from one recorded period (pays off on long strips)
+BAKE_BUDGET = 12288  # bytes the recorded periods may use together (8 px: Breathe 11.5 KB, Rainbow 6.4 KB)
 
 FADE_STEPS = 8
 FADE_DELAY = 0.0135  # s
 
+USE_ASYNCIO = False  # True → input, photocell and rendering run as asyncio tasks
+INPUT_PERIOD = 0.005  # s, asyncio input task
+
+GC_LOW_WATER = 4096  # bytes free that force a collection
+GC_IDLE_PERIOD = 1.0  # s between collections while the loop is idle
+
+PROFILE = False  # ← set True to time each loop stage (plain loop only)
+PROFILE_DUMP_PERIOD = 10.0  # s between stage timing dumps
+# stages of one loop pass, in order
+SWITCH, CLICKS, PHOTO, STATE, RENDER, SHOW, GC, SLEEP = range(8)
+
+# laps time the stages back to back, so they need the one loop running
+# them in order; asyncio tasks interleave and would charge each other
+if PROFILE and not USE_ASYNCIO:
+    from looptimer import StageTimer
+
+    stages = StageTimer(
+        ("switch", "clicks", "photo", "state", "render", "show", "gc", "sleep"), PROFILE_DUMP_PERIOD
+    )
+    lap = stages.lap  # time since the previous lap → that stage
+    lap_poll = stages.poll
+
+else:
+
+    def lap(_):
+        pass  # stub → zero run-time cost
+
+    def lap_poll(_):
+        pass
+
+
 # ────────────────────── COLORS ───────────────────────────────
 OFF = (0, 0, 0)
 CUST_YL = (255, 150, 20)
@@ -66,31 +140,67 @@ S_LBLUE = (100, 180, 255)
 GREEN_OK = (0, 255, 0)
 RED_ALERT = (255, 0, 0)
 
-OFF_LIST = [OFF] * NUM_PIXELS  # reusable “blank” buffer
+# ─────────────────── FRAMEBUFFERS ─────────────────────────────
+# Preallocated once; a steady-state frame writes into these in place.
+fade_src = pixbuf.frame(NUM_PIXELS)
+fade_dst = pixbuf.frame(NUM_PIXELS)
+OFF_FRAME = pixbuf.frame(NUM_PIXELS)  # reusable “blank” buffer
 
-# ─────────────────── HARDWARE SET-UP ──────────────────────────
-m_switch = DigitalInOut(M_SWITCH_PIN)
-m_switch.direction = Direction.INPUT
-m_switch.pull = Pull.UP
-m_prev = True
-m_click_time = 0.0
-
-l_switch = DigitalInOut(L_SWITCH_PIN)
-l_switch.direction = Direction.INPUT
-l_switch.pull = Pull.UP
+BREATH_MIN_LVL = int(BREATH_MIN * 255)  # breathe level = palette index
+BREATH_MAX_LVL = int(BREATH_MAX * 255)
+BREATH_SPAN = BREATH_MAX_LVL - BREATH_MIN_LVL  # levels / half cycle
+BREATH_RATE = BREATH_SPEED * 255  # levels / s
 
-photocell = analogio.AnalogIn(PHOTOCELL_PIN)
+# ─────────────────── HARDWARE SET-UP ──────────────────────────
+# both switches are scanned + debounced in the background by keypad
+buttons = Buttons(
+    (M_SWITCH_PIN, L_SWITCH_PIN), DOUBLE_CLICK_WINDOW, LONG_PRESS_TIME, DEBOUNCE_TIME, speculative=SPECULATIVE_CLICK
+)
+M_KEY = 0
+L_KEY = 1
+
+# one block read per filter sample: the ADC is touched 5×/s, not 100×/s
+photocell = BufferedPhotocell(PHOTOCELL_PIN, PHOTO_BLOCK, PHOTO_BLOCK_RATE)
+photo = PhotoFilter(
+    photocell,
+    PHOTO_ON_THRESHOLD,
+    PHOTO_OFF_THRESHOLD,
+    PHOTO_SAMPLE_PERIOD,
+    1,  # the block mean is already oversampled
+    PHOTO_MEDIAN,
+    PHOTO_EMA_SHIFT,
+)
+cal = Calibrator(CAL_PERIOD, CAL_SAVE_PERIOD, nvm=microcontroller.nvm)
+if PHOTO_AUTO_CAL and cal.load():
+    cal.apply(photo)
 photocell_enabled = True
 
-pixels = neopixel.NeoPixel(NEOPIXEL_PIN, NUM_PIXELS, brightness=1.0, auto_write=False)
+# every chain has its own framebuffer and Output; fades and blinks play
+# on the interior strip, the others follow the animation clock
+tone = None  # frames go out as rendered …
+if GAMMA != 1.0 or BRIGHTNESS != 1.0 or DITHER:
+    tone = ToneMap(GAMMA, BRIGHTNESS, DITHER)  # … or through these tables
+strips = StripSet(
+    (("interior", NEOPIXEL_PIN, NUM_PIXELS),) + tuple(s[:3] for s in EXTRA_STRIPS),
+    PARALLEL_TX,
+    tone=tone,
+    timed=TX_TIMING,
+)
+interior = strips["interior"]
+out = interior.out  # skips show() for unchanged frames
+frame = interior.frame  # mirrors what was last sent to the strip
+fx = Scheduler()  # fades / blinks run one frame per loop tick
+latency = LatencyMeter(out)  # press → first frame answering it
+gcp = GCPolicy(GC_LOW_WATER, GC_IDLE_PERIOD)
 
 # ───────────────────────── STATE ──────────────────────────────
 pixels_on = False
 mode_idx = 0
+mode_player = None  # mode_render(mode_idx), looked up once per mode change
+undo_mode = None  # mode a tentative click left, until it is confirmed or cancelled
 
-rainbow_offset = 0
-breath_intensity = BREATH_MIN
-breath_dir = 1
+anim = AnimClock(ANIM_FPS, ANIM_MAX_LAG)  # modes are pure functions of anim.t
+governor = FrameGovernor(FX_FPS, LOOP_MAX_PERIOD)  # sleeps to the next deadline
 
 
 # ─────────────────────── HELPERS ──────────────────────────────
@@ -106,160 +216,291 @@ def wheel(pos):
     return 0, pos * 3, 255 - pos * 3
 
 
-def lerp(c1, c2, t):
-    return (
-        int(c1[0] + (c2[0] - c1[0]) * t),
-        int(c1[1] + (c2[1] - c1[1]) * t),
-        int(c1[2] + (c2[2] - c1[2]) * t),
-    )
+def breath_color(level):
+    k = (level / 255) ** BREATH_GAMMA  # perceived → emitted (palette build only)
+    return int(WHITE[0] * k + 0.5), int(WHITE[1] * k + 0.5), int(WHITE[2] * k + 0.5)
+
+
+def show(dirty=None):
+    out.show(frame, dirty)
 
 
 def fade(src, dst):
-    for step in range(FADE_STEPS + 1):
-        t = step / FADE_STEPS
-        for i in range(NUM_PIXELS):
-            pixels[i] = lerp(src[i], dst[i], t)
-        pixels.show()
-        time.sleep(FADE_DELAY)
+    return Fade(out, frame, src, dst, FADE_STEPS, FADE_DELAY)
+
+
+def crossfade(old, new):
+    return Crossfade(out, frame, old, new, fade_src, fade_dst, anim_time, FADE_STEPS, FADE_DELAY)
+
+
+def anim_time():
+    return anim.t
 
 
 def snapshot():
-    return list(pixels)  # copy current strip buffer
+    pixbuf.copy(fade_src, frame)  # copy current strip buffer
+    return fade_src
 
 
 def capture(index):
-    original = pixels.brightness
-    pixels.brightness = 0.0
-    MODES[index][1]()
-    buf = list(pixels)
-    pixels.brightness = original
-    return buf
+    mode_render(index)(anim.t, fade_dst)  # no show(), no animation state touched
+    return fade_dst
 
 
 def blink(color):
-    for _ in range(ALERT_BLINKS):
-        pixels.fill(color)
-        pixels.show()
-        time.sleep(ALERT_BLINK_TIME)
-        pixels.fill(OFF)
-        pixels.show()
-        time.sleep(ALERT_BLINK_TIME)
+    return Blink(out, frame, color, OFF, ALERT_BLINKS, ALERT_BLINK_TIME)
+
+
+def capture_current():
+    return capture(mode_idx)
+
+
+def transition(effect):
+    # an alert blink (still queued or playing) finishes before the fade
+    if fx.queue or isinstance(fx.active, Blink):
+        fx.then(effect)
+    else:
+        fx.play(effect)
+
+
+def set_mode(index, origin):
+    global mode_idx, mode_player
+    old = mode_player
+    mode_idx = index
+    mode_player = mode_render(index)
+    if pixels_on:  # both modes keep animating through the blend
+        fx.play(crossfade(old, mode_player))
+        latency.mark(origin)
+
+
+# ─────────────────────── PALETTES ─────────────────────────────
+# Built once at startup; a palette frame is then a table copy.
+RAINBOW = Palette(wheel)
+BREATH = Palette(breath_color)
 
 
 # ───────────────────────── MODES ──────────────────────────────
-def mode_default():
-    buf = [WHITE] * NUM_PIXELS
-    buf[0] = CUST_YL
-    buf[4] = CUST_RD
-    pixels[:] = buf
-    pixels.show()
+# render(t, buf): fill `buf` with the frame for animation time `t` (s).
+# Pure – no hardware, no globals written – so fades and previews can
+# render any mode into any buffer. Return True if the frame is known to
+# differ from the previous one (skips the output compare).
+def mode_default(t, buf):
+    fill(buf, WHITE)
+    set_pixel(buf, 0, CUST_YL)
+    set_pixel(buf, 4, CUST_RD)
 
 
-def mode_rainbow():
-    global rainbow_offset
-    for i in range(NUM_PIXELS):
-        idx = (i * 256 // NUM_PIXELS) + rainbow_offset
-        pixels[i] = wheel(idx & 255)
-    pixels.show()
-    rainbow_offset = (rainbow_offset + RAINBOW_SPEED) & 255
+def mode_rainbow(t, buf):
+    RAINBOW.spread(buf, int(t * RAINBOW_SPEED))
+    return True  # always moving
 
 
 def mode_static(color):
-    pixels.fill(color)
-    pixels.show()
-
-
-def mode_breathe():
-    global breath_intensity, breath_dir
-    breath_intensity += BREATH_STEP * breath_dir
-    if breath_intensity >= BREATH_MAX:
-        breath_intensity = BREATH_MAX
-        breath_dir = -1
-    elif breath_intensity <= BREATH_MIN:
-        breath_intensity = BREATH_MIN
-        breath_dir = 1
-    scaled = (
-        int(WHITE[0] * breath_intensity),
-        int(WHITE[1] * breath_intensity),
-        int(WHITE[2] * breath_intensity),
-    )
-    pixels.fill(scaled)
-    pixels.show()
+    def render(t, buf):
+        fill(buf, color)
+
+    return render
+
+
+def mode_breathe(t, buf):
+    k = int(t * BREATH_RATE) % (2 * BREATH_SPAN)  # triangle wave
+    if k > BREATH_SPAN:
+        k = 2 * BREATH_SPAN - k
+    BREATH.fill(buf, BREATH_MIN_LVL + k)
+    return True
 
 
 MODES = (
     ("Default", mode_default),
-    ("Static Red", lambda: mode_static(S_RED)),
-    ("Static Orange", lambda: mode_static(S_ORANGE)),
-    ("Static Yellow", lambda: mode_static(S_YELLOW)),
-    ("Static Green", lambda: mode_static(S_GREEN)),
-    ("Static Blue", lambda: mode_static(S_BLUE)),
-    ("Static Violet", lambda: mode_static(S_VIOLET)),
-    ("Static LBlue", lambda: mode_static(S_LBLUE)),
+    ("Static Red", mode_static(S_RED)),
+    ("Static Orange", mode_static(S_ORANGE)),
+    ("Static Yellow", mode_static(S_YELLOW)),
+    ("Static Green", mode_static(S_GREEN)),
+    ("Static Blue", mode_static(S_BLUE)),
+    ("Static Violet", mode_static(S_VIOLET)),
+    ("Static LBlue", mode_static(S_LBLUE)),
     ("Breathe White", mode_breathe),
     ("Rainbow", mode_rainbow),
 )
 
+# Periodic modes: (steps / s, steps per period), matching how each one
+# derives its step from t. Baked into `frames` when they fit BAKE_BUDGET.
+PERIODIC = {
+    "Rainbow": (RAINBOW_SPEED, 256),
+    "Breathe White": (BREATH_RATE, 2 * BREATH_SPAN),
+}
+frames = FrameCache(BAKE_BUDGET)
+
+# Loop rate each mode needs; the rest are static and only poll input.
+MODE_FPS = {
+    "Rainbow": ANIM_FPS,
+    "Breathe White": ANIM_FPS,
+}
+
+
+def mode_render(index):
+    name, render = MODES[index]
+    if not BAKE_MODES or name not in PERIODIC:
+        return render
+    rate, steps = PERIODIC[name]
+    return frames.get(name, render, rate, steps, len(frame))
+
+
+mode_player = mode_render(mode_idx)
+
+for name, _, _, mode in EXTRA_STRIPS:
+    strips[name].render = dict(MODES)[mode]
+EXTRA_FPS = max([MODE_FPS.get(s[3], 0) for s in EXTRA_STRIPS] + [0])
+
+
+def loop_fps():
+    if fx.busy:
+        return FX_FPS
+    if not pixels_on:
+        return 0
+    fps = MODE_FPS.get(MODES[mode_idx][0], 0)
+    return fps if fps > EXTRA_FPS else EXTRA_FPS
+
+
+def dump_stats():
+    if not DEBUG:
+        return
+    print("Press-to-photon n / mean s / max s:", *latency.stats())
+    print("Button events dropped:", buttons.dropped)
+    print("Frames sent / skipped:", out.sent, out.skipped)
+    print("Strip transmissions / (strip, sent, skipped):", *strips.stats())
+    if TX_TIMING:
+        print("Transmit frames / overlap / peak fps:", *strips.tx_stats())
+    print("Baked bytes / bakes / evictions / too big:", *frames.stats())
+    print("Anim frames / dropped / slipped s:", *anim.stats())
+    print("Loop iterations / overruns / worst s / period s:", *governor.stats())
+    print("Loop lateness histogram (ms bins):", list(governor.jitter))
+    print("GC runs / forced / µs / max µs / heap low:", *gcp.stats())
+    print("Photo value / raw / flips / raw flips / prevented:", *photo.stats())
+    print("Photo ADC blocks / buffered?", photocell.blocks, photocell.buffered)
+
+
 # ──────────────────── STARTUP ─────────────────────────────────
-pixels.fill(OFF)
-pixels.show()
+show()  # frame starts zeroed → strip off
 gc.collect()
 dbg("Startup complete")
 
-# ──────────────────── MAIN LOOP ───────────────────────────────
-while True:
-    now = time.monotonic()
-    m_state = m_switch.value  # pull-up: True → not pressed
-    l_active = not l_switch.value
-    photo_val = photocell.value
+# ──────────────────── LOOP STAGES ─────────────────────────────
+# One pass of the controller, split so the asyncio runtime can run each
+# stage at its own rate. They share state through the globals above and
+# the button event queue.
+l_active = False
+
+
+def poll_input(now):
+    global l_active, photocell_enabled, undo_mode
+    buttons.poll(now)
+    l_active = buttons.is_down(L_KEY)
+    lap(SWITCH)
 
     # ── momentary switch events ───────────────────────────────
-    if m_prev and not m_state:  # falling edge
-        dbg("M-switch press @", now)
-        if m_click_time and (now - m_click_time < DOUBLE_CLICK_WINDOW):
+    event = buttons.get()
+    while event:
+        kind, key, t, origin = event
+        event = buttons.get()
+        if key != M_KEY:
+            continue
+        if kind == PRESS:
+            dbg("M-switch press @", t)
+        elif kind == TENTATIVE_CLICK:
+            undo_mode = mode_idx  # act now, the window may still cancel it
+            set_mode((mode_idx + 1) % len(MODES), origin)
+        elif kind == CANCEL_CLICK:
+            dbg("Click cancelled: back to mode", undo_mode)
+            set_mode(undo_mode, t)
+            undo_mode = None
+        elif kind == DOUBLE_CLICK:
             photocell_enabled = not photocell_enabled
             dbg("Double-click: photocell enabled?", photocell_enabled)
-            blink(GREEN_OK if photocell_enabled else RED_ALERT)
-            m_click_time = 0.0
+            fx.play(blink(GREEN_OK if photocell_enabled else RED_ALERT))
+        elif kind == CLICK:
+            if SPECULATIVE_CLICK:
+                dbg("Single-click confirmed")
+                undo_mode = None
+            else:
+                dbg("Single-click: advance mode")
+                set_mode((mode_idx + 1) % len(MODES), origin)
+            dbg("Current mode →", mode_idx, MODES[mode_idx][0])
+            dump_stats()
         else:
-            m_click_time = now
-
-    if m_click_time and (now - m_click_time >= DOUBLE_CLICK_WINDOW):
-        dbg("Single-click: advance mode")
-        if pixels_on:
-            fade(snapshot(), OFF_LIST)
-            mode_idx = (mode_idx + 1) % len(MODES)
-            fade(OFF_LIST, capture(mode_idx))
-        else:
-            mode_idx = (mode_idx + 1) % len(MODES)
-        dbg("Current mode →", mode_idx, MODES[mode_idx][0])
-        m_click_time = 0.0
+            dbg("M-switch", NAMES[kind], "@", t)
+    lap(CLICKS)
+
+
+def sample_photo(now):
+    # samples at its own PHOTO_SAMPLE_PERIOD
+    if photo.poll(now) and PHOTO_AUTO_CAL and cal.poll(now, photo.value):
+        if cal.apply(photo):
+            dbg("Photo thresholds learned:", photo.on_threshold, photo.off_threshold)
+    lap(PHOTO)
 
-    m_prev = m_state
 
+def update_state(now):
+    global pixels_on
     # ── desired LED state calculation ────────────────────────
-    want_on = l_active
-    if not want_on and photocell_enabled:
-        if pixels_on:
-            want_on = photo_val <= PHOTO_OFF_THRESHOLD
-        else:
-            want_on = photo_val < PHOTO_ON_THRESHOLD
+    # (photo.dark already applies the ON/OFF hysteresis to the
+    #  filtered value)
+    want_on = l_active or (photocell_enabled and photo.dark)
 
     # ── state transition handling ─────────────────────────────
     if want_on and not pixels_on:
         dbg("Turn ON: fade-in")
-        fade(OFF_LIST, capture(mode_idx))
+        transition(fade(snapshot, capture_current))
         pixels_on = True
 
     elif not want_on and pixels_on:
         dbg("Turn OFF: fade-out")
-        fade(snapshot(), OFF_LIST)
-        pixels.fill(OFF)
-        pixels.show()
+        transition(fade(snapshot, OFF_FRAME))
+        strips.render(anim.t, False)
         pixels_on = False
+    lap(STATE)
+
+
+def render_frame(now):
+    # ── one effect frame, or one animation frame ─────────────
+    # (the animation clock holds still while a fade or blink owns the
+    #  strip, and keeps running through a crossfade; a loop paced below
+    #  the animation rate on purpose isn't dropping frames)
+    due = anim.tick(now, pixels_on and not fx.holds_animation, governor.period <= anim.period)
+    animate = not fx.tick(now) and due
+    if animate:
+        dirty = mode_player(anim.t, frame)  # run animation frame
+    if due:
+        strips.render(anim.t)  # the other chains' modes, same frame time
+    lap(RENDER)  # (effect frames and serial extra strips include their show)
+    if animate:
+        show(dirty)
+    strips.flush()  # parallel: every strand in one transmission
+    latency.poll(time.monotonic())
+    lap(SHOW)
+
+    # collect when the heap runs low, or while nothing is animating
+    gcp.poll(now, idle=not pixels_on or fx.busy)
+    lap(GC)
+
 
-    elif pixels_on:
-        MODES[mode_idx][1]()  # run animation frame
+# ──────────────────── MAIN LOOP ───────────────────────────────
+if USE_ASYNCIO:
+    import runtime
 
-    gc.collect()
-    time.sleep(0.01)
+    runtime.run(  # never returns
+        (INPUT_PERIOD, poll_input, update_state),
+        (PHOTO_SAMPLE_PERIOD, sample_photo),
+        (1 / ANIM_FPS, render_frame),
+    )
+
+while True:
+    now = time.monotonic()
+    poll_input(now)
+    sample_photo(now)
+    update_state(now)
+    render_frame(now)
+    governor.set_fps(loop_fps())
+    governor.sleep()  # until the next deadline at the current mode's rate
+    lap(SLEEP)
+    lap_poll(now)
@@ -9,6 +9,10 @@ import board
 import neopixel
 import analogio
 
+from photo import PhotoFilter
+import telemetry
+from telemetry import Telemetry
+
 # ────────────────────── CONFIG ────────────────────────────────
 DEBUG = True  # Set True to see diagnostics
 
@@ -19,6 +23,12 @@ else:
     def dbg(*_):
         pass  # No-op if DEBUG is False
 
+# Readings are logged as binary telemetry records and flushed in bulk,
+# not printed every loop (decode with sim/decode.py)
+TELEMETRY = True
+TLM_RECORDS = 256     # ring size, 10 bytes per record
+TLM_FLUSH_PERIOD = 2.0  # s between flushes
+
 # Pin Definitions (from original code)
 PHOTOCELL_PIN = board.A2
 NEOPIXEL_PIN = board.D2
@@ -30,6 +40,12 @@ NUM_PIXELS = 8  # Number of NeoPixels
 PHOTO_ON_THRESHOLD = 9500   # Value to turn lights ON
 PHOTO_OFF_THRESHOLD = 10500 # Value to turn lights OFF (hysteresis)
 
+# Photocell filter: oversample → running median → EMA
+PHOTO_SAMPLE_PERIOD = 0.05  # s between filtered samples
+PHOTO_OVERSAMPLE = 4        # ADC reads averaged per sample
+PHOTO_MEDIAN = 9            # samples in the running median
+PHOTO_EMA_SHIFT = 3         # EMA weight 1/8
+
 # Colors
 ON_COLOR = (255, 150, 80) # A slightly dimmer white for testing
 OFF_COLOR = (0, 0, 0)
@@ -39,6 +55,10 @@ dbg("Setting up hardware...")
 
 # Initialize Photocell
 photocell = analogio.AnalogIn(PHOTOCELL_PIN)
+photo = PhotoFilter(
+    photocell, PHOTO_ON_THRESHOLD, PHOTO_OFF_THRESHOLD,
+    PHOTO_SAMPLE_PERIOD, PHOTO_OVERSAMPLE, PHOTO_MEDIAN, PHOTO_EMA_SHIFT
+)
 dbg("Photocell initialized on pin", PHOTOCELL_PIN)
 
 # Initialize NeoPixels
@@ -47,6 +67,13 @@ pixels = neopixel.NeoPixel(
 )
 dbg("NeoPixels initialized on pin", NEOPIXEL_PIN, "with", NUM_PIXELS, "pixels.")
 
+if TELEMETRY:
+    tlm = Telemetry(TLM_RECORDS, idle_period=TLM_FLUSH_PERIOD)
+    log = tlm.log
+else:
+    def log(*_):
+        pass
+
 # ───────────────────────── STATE ──────────────────────────────
 pixels_on = False  # Tracks the current state of the NeoPixels
 
@@ -59,26 +86,27 @@ dbg("Photocell thresholds: ON <", PHOTO_ON_THRESHOLD, ", OFF >", PHOTO_OFF_THRES
 # ──────────────────── MAIN LOOP ───────────────────────────────
 dbg("Starting main loop...")
 while True:
-    current_photo_value = photocell.value
-    dbg(">value:", current_photo_value, "\r\n")
-
-    # Determine desired LED state based on photocell value and hysteresis
-    if pixels_on:
-        # Pixels are currently ON, check if they should turn OFF
-        if current_photo_value > PHOTO_OFF_THRESHOLD:
-            dbg("Condition to turn OFF met:", current_photo_value, ">", PHOTO_OFF_THRESHOLD)
-            pixels_on = False
-            pixels.fill(OFF_COLOR)
-            pixels.show()
-            dbg("NeoPixels turned OFF.")
-    else:
-        # Pixels are currently OFF, check if they should turn ON
-        if current_photo_value < PHOTO_ON_THRESHOLD:
-            dbg("Condition to turn ON met:", current_photo_value, "<", PHOTO_ON_THRESHOLD)
-            pixels_on = True
+    now = time.monotonic()
+    if photo.poll(now):
+        log(telemetry.PHOTO_RAW, photo.raw)
+        log(telemetry.PHOTO_VALUE, photo.value)
+
+    # Desired LED state: the filter applies the hysteresis to the
+    # smoothed value, so noise around a threshold doesn't flap the lights
+    if photo.dark != pixels_on:
+        pixels_on = photo.dark
+        if pixels_on:
+            dbg("Condition to turn ON met:", photo.value, "<", PHOTO_ON_THRESHOLD)
             pixels.fill(ON_COLOR)
-            pixels.show()
-            dbg("NeoPixels turned ON.")
+        else:
+            dbg("Condition to turn OFF met:", photo.value, ">", PHOTO_OFF_THRESHOLD)
+            pixels.fill(OFF_COLOR)
+        pixels.show()
+        log(telemetry.LIGHTS, pixels_on)
+        dbg("NeoPixels turned", "ON." if pixels_on else "OFF.",
+            "Flips prevented so far:", photo.prevented)
+    elif TELEMETRY:
+        tlm.poll(now, idle=True)  # nothing changed: a good time to flush
 
     # Small delay to allow USB serial to keep up and prevent overly fast loops
     # Adjust if necessary for "as often as possible" while maintaining stability
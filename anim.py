@@ -0,0 +1,47 @@
+"""
+Animation clock and frame pacing
+Modes render from animation time in seconds, not from how many times the
+loop has spun, so visual speed no longer depends on loop rate. Frames sit
+on a fixed grid: a late loop drops the frames it missed and renders the
+current one, a long stall (> max_lag) slips the clock instead of jumping.
+"""
+
+
+class AnimClock:
+    def __init__(self, fps, max_lag):
+        self.period = 1 / fps
+        self.max_lag = max_lag  # s; a longer gap pauses the animation
+        self.t = 0.0  # animation time of the frame last due
+        self.elapsed = 0.0  # animation time that has run so far
+        self.frame = -1  # grid index of the frame last due
+        self.rendered = 0
+        self.dropped = 0  # frames skipped because the loop was late
+        self.slipped = 0.0  # s the clock gave up to stalls
+        self._now = None
+
+    def tick(self, now, running=True, paced=True):
+        """Advance to `now`. Returns True when a new frame is due; render
+        it at self.t. With running=False the animation holds still (e.g.
+        while a fade owns the strip) and no frame is due. paced=False says
+        the loop runs slower than the grid on purpose (a static mode), so
+        the frames it passes over are not counted as dropped."""
+        dt = 0.0 if self._now is None else now - self._now
+        self._now = now
+        if not running:
+            return False
+        if dt > self.max_lag:
+            self.slipped += dt - self.max_lag
+            dt = self.max_lag
+        self.elapsed += dt
+        n = int(self.elapsed / self.period)
+        if n == self.frame:
+            return False
+        if paced and self.frame >= 0 and n > self.frame + 1:
+            self.dropped += n - self.frame - 1
+        self.frame = n
+        self.t = n * self.period
+        self.rendered += 1
+        return True
+
+    def stats(self):
+        return self.rendered, self.dropped, self.slipped
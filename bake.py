@@ -0,0 +1,82 @@
+"""
+Baked animation frames
+A periodic mode repeats exactly, so one period of it can be kept as packed
+frames and played back by buffer copy instead of being rendered again. A
+period is baked while it plays the first time (each step is rendered live
+once and recorded), so switching to a mode never stalls on a bake.
+FrameCache keeps baked modes in least-recently-used order within a RAM
+budget; a mode that can't fit stays live.
+"""
+
+
+class Baked:
+    """One period of `render`: `frames` steps at `rate` steps per second,
+    step k being int(t * rate) % frames – the same step the mode itself
+    computes from t. Callable like the mode."""
+
+    def __init__(self, render, rate, frames, frame_size):
+        self.render = render
+        self.frames = frames
+        self.rate = rate
+        self.size = frame_size
+        self.store = bytearray(frames * frame_size)
+        self.view = memoryview(self.store)
+        self.filled = bytearray(frames)  # 1 once step k is recorded
+
+    @property
+    def nbytes(self):
+        return len(self.store) + len(self.filled)
+
+    def __call__(self, t, buf):
+        k = int(t * self.rate) % self.frames
+        i = k * self.size
+        if self.filled[k]:
+            buf[:] = self.view[i : i + self.size]
+        else:
+            self.render(t, buf)
+            self.store[i : i + self.size] = buf
+            self.filled[k] = 1
+        return True
+
+
+class FrameCache:
+    def __init__(self, budget):
+        self.budget = budget  # bytes all baked modes may use together
+        self.used = 0
+        self._baked = {}  # key → Baked
+        self._order = []  # keys, least recently used first
+        self.bakes = 0
+        self.evictions = 0
+        self.live = 0  # modes too big for the budget, which play live
+        self._too_big = set()
+
+    def get(self, key, render, rate, frames, frame_size):
+        """The baked player for `key`, made (and older modes evicted) if
+        needed; `render` itself if one period is bigger than the budget."""
+        baked = self._baked.get(key)
+        if baked is not None:
+            self._order.remove(key)
+            self._order.append(key)
+            return baked
+        need = frames * (frame_size + 1)
+        if need > self.budget:
+            if key not in self._too_big:
+                self._too_big.add(key)
+                self.live += 1
+            return render
+        while self.used + need > self.budget:
+            self._evict()
+        baked = Baked(render, rate, frames, frame_size)
+        self._baked[key] = baked
+        self._order.append(key)
+        self.used += baked.nbytes
+        self.bakes += 1
+        return baked
+
+    def _evict(self):
+        key = self._order.pop(0)
+        self.used -= self._baked.pop(key).nbytes
+        self.evictions += 1
+
+    def stats(self):
+        return self.used, self.bakes, self.evictions, self.live
@@ -0,0 +1,206 @@
+"""
+Cooperative effect scheduler
+Fades, blinks and alert flashes advance one frame per main-loop tick against
+time.monotonic(), so the switches keep getting polled mid-transition.
+"""
+
+from pixbuf import BPP, ONE
+from vecbuf import blend, fill
+
+
+def _resolve(frame):
+    return frame() if callable(frame) else frame
+
+
+# ─────────────────────── EFFECTS ──────────────────────────────
+class Effect:
+    """A timed effect. step() draws the frame due at `now` and
+    returns True while there is more to come."""
+
+    animated = False  # True → the animation clock keeps running meanwhile
+
+    def start(self, now):
+        self.t0 = now
+
+    def step(self, now):
+        return False
+
+
+class Fade(Effect):
+    """steps+1 frames from src to dst, `delay` seconds apart, blended into
+    the preallocated frame `out` and sent through `output`. src/dst are
+    frames, or callables returning one; callables are resolved when the
+    fade starts."""
+
+    def __init__(self, output, out, src, dst, steps, delay):
+        self.output = output
+        self.out = out
+        self.src = src
+        self.dst = dst
+        self.steps = steps
+        self.delay = delay
+
+    def start(self, now):
+        self.t0 = now
+        self._src = _resolve(self.src)
+        self._dst = _resolve(self.dst)
+        self._step = -1
+
+    def step(self, now):
+        step = min(int((now - self.t0) / self.delay), self.steps)
+        if step != self._step:
+            self._step = step
+            blend(self.out, self._src, self._dst, step * ONE // self.steps)
+            self.output.show(self.out)
+        return step < self.steps
+
+
+class Crossfade(Effect):
+    """Blends straight from one mode to another over `steps` frames,
+    `delay` seconds apart, with both still animating: every step renders
+    `old` and `new` (render(t, buf) functions) at the animation time
+    `clock()` into the scratch frames a and b, and sends the blend. Half
+    the time of a fade out and back in, and no dark gap."""
+
+    animated = True
+
+    def __init__(self, output, out, old, new, a, b, clock, steps, delay):
+        self.output = output
+        self.out = out
+        self.old = old
+        self.new = new
+        self.a = a
+        self.b = b
+        self.clock = clock
+        self.steps = steps
+        self.delay = delay
+
+    def step(self, now):
+        step = min(int((now - self.t0) / self.delay), self.steps)
+        t = self.clock()
+        self.new(t, self.b)
+        if step < self.steps:
+            self.old(t, self.a)
+            blend(self.out, self.a, self.b, step * ONE // self.steps)
+        else:
+            self.out[:] = self.b
+        self.output.show(self.out)
+        return step < self.steps
+
+
+class Blink(Effect):
+    """`count` on/off flashes of one colour, drawn into `buf` and sent
+    through `output`; always ends dark."""
+
+    def __init__(self, output, buf, color, off, count, on_time, off_time=None):
+        self.output = output
+        self.buf = buf
+        self.color = color
+        self.off = off
+        self.count = count
+        self.on_time = on_time
+        self.period = on_time + (on_time if off_time is None else off_time)
+
+    def start(self, now):
+        self.t0 = now
+        self._lit = None
+
+    def step(self, now):
+        elapsed = now - self.t0
+        cycle = int(elapsed / self.period)
+        lit = cycle < self.count and elapsed - cycle * self.period < self.on_time
+        if lit != self._lit:
+            self._lit = lit
+            fill(self.buf, self.color if lit else self.off)
+            self.output.show(self.buf)
+        return cycle < self.count
+
+
+class Reveal(Effect):
+    """Lights the pixels one at a time, in order: each stays dark for
+    `hold` steps, then fades in over `steps` steps to its colour in
+    `colors`, `delay` seconds per step. Pixels already revealed stay lit.
+    The position in the sequence is all the state there is, so a tick
+    draws only the step that is due and a late tick catches up."""
+
+    def __init__(self, output, buf, colors, hold, steps, delay):
+        self.output = output
+        self.buf = buf
+        self.colors = colors
+        self.hold = hold
+        self.steps = steps
+        self.delay = delay
+        self.total = len(colors) * (hold + steps)
+
+    def start(self, now):
+        self.t0 = now
+        fill(self.buf, (0, 0, 0))
+        self._step = -1
+
+    def step(self, now):
+        step = min(int((now - self.t0) / self.delay), self.total)
+        if step != self._step:
+            self._draw(max(self._step, 0), step)
+            self._step = step
+            self.output.show(self.buf)
+        return step < self.total
+
+    def _draw(self, old, step):
+        per = self.hold + self.steps
+        pixel = step // per
+        for i in range(old // per, min(pixel, len(self.colors))):
+            self._level(i, self.steps)  # finished, also any a late tick skipped
+        if pixel < len(self.colors):
+            self._level(pixel, max(0, step - pixel * per - self.hold + 1))
+
+    def _level(self, index, k):
+        color, steps, buf = self.colors[index], self.steps, self.buf
+        i = index * BPP
+        buf[i] = color[0] * k // steps
+        buf[i + 1] = color[1] * k // steps
+        buf[i + 2] = color[2] * k // steps
+
+
+# ─────────────────────── SCHEDULER ────────────────────────────
+class Scheduler:
+    """Runs queued effects back to back, one frame per tick()."""
+
+    def __init__(self):
+        self.queue = []
+        self.active = None
+
+    @property
+    def busy(self):
+        return self.active is not None or bool(self.queue)
+
+    def play(self, *effects):
+        """Drop whatever is running and start `effects` in order."""
+        self.active = None
+        self.queue = list(effects)
+
+    def then(self, *effects):
+        """Append `effects` after whatever is already queued."""
+        self.queue.extend(effects)
+
+    def cancel(self):
+        self.active = None
+        self.queue = []
+
+    @property
+    def holds_animation(self):
+        """True while the running effect wants the animation clock to
+        hold still (a fade from a captured frame, a blink)."""
+        return self.active is not None and not self.active.animated
+
+    def tick(self, now):
+        """Advance the running effect. Returns True while the scheduler
+        owns the pixels, False once the caller may render again."""
+        while True:
+            if self.active is None:
+                if not self.queue:
+                    return False
+                self.active = self.queue.pop(0)
+                self.active.start(now)
+            if self.active.step(now):
+                return True
+            self.active = None
@@ -0,0 +1,57 @@
+"""
+Adaptive garbage collection
+Instead of gc.collect() on every loop, collect when free heap falls below a
+watermark, or opportunistically when the loop has slack (pixels off, or a
+fade is waiting for its next frame).
+"""
+
+import gc
+import time
+
+_mem_free = getattr(gc, "mem_free", None)  # CircuitPython only
+
+
+def _ticks_us():
+    return time.monotonic_ns() // 1000
+
+
+class GCPolicy:
+    def __init__(self, low_water, idle_period):
+        self.low_water = low_water  # bytes free below which we must collect
+        self.idle_period = idle_period  # s between opportunistic collections
+        self.collections = 0
+        self.forced = 0  # of which triggered by the watermark
+        self.time_us = 0  # total time spent collecting
+        self.max_us = 0  # longest single collection
+        self.heap_low = None  # lowest free heap seen (None on host)
+        self._last = None
+
+    def poll(self, now, idle=False):
+        """Call once per loop. Collects if the heap is low, or if `idle`
+        and the last collection is idle_period old. Returns True if it did."""
+        forced = False
+        if _mem_free is not None:
+            free = _mem_free()
+            if self.heap_low is None or free < self.heap_low:
+                self.heap_low = free
+            forced = free < self.low_water
+        if not forced:
+            if not idle or (self._last is not None and now - self._last < self.idle_period):
+                return False
+        self.collect(now)
+        if forced:
+            self.forced += 1
+        return True
+
+    def collect(self, now):
+        t0 = _ticks_us()
+        gc.collect()
+        dt = _ticks_us() - t0
+        self._last = now
+        self.collections += 1
+        self.time_us += dt
+        if dt > self.max_us:
+            self.max_us = dt
+
+    def stats(self):
+        return self.collections, self.forced, self.time_us, self.max_us, self.heap_low
@@ -0,0 +1,64 @@
+"""
+Frame governor
+Ends a loop iteration by sleeping until the iteration's deadline instead of
+for a fixed time, so the loop period no longer stretches with render and
+GC cost. The period follows a target fps that can change every iteration
+(a static mode needs next to no frames, a fade needs many), bounded by
+max_period so input and sensors are still polled. An iteration that ends
+past its deadline is an overrun: the schedule restarts from there rather
+than bursting to catch up. Lateness against the deadline goes into a
+preallocated histogram; all of it is readable while the loop runs.
+"""
+
+import time
+from array import array
+
+
+class FrameGovernor:
+    def __init__(self, fps, max_period, bins=16, bin_width=0.001):
+        self.max_period = max_period  # s; the slowest the loop may run
+        self.bin_width = bin_width  # s of lateness per histogram bin
+        self.jitter = array("L", [0] * bins)  # last bin: bin_width × (bins - 1) s or later
+        self.iterations = 0
+        self.overruns = 0  # iterations that ended past their deadline
+        self.worst = 0.0  # s, longest iteration (work only, not the sleep)
+        self.period = max_period
+        self._deadline = None
+        self._wake = None
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        """Target rate for the following iterations; 0 = as slow as allowed."""
+        period = 1 / fps if fps else self.max_period
+        self.period = period if period < self.max_period else self.max_period
+
+    def sleep(self):
+        """Call at the end of every iteration in place of time.sleep()."""
+        now = time.monotonic()
+        if self._wake is not None:
+            work = now - self._wake
+            if work > self.worst:
+                self.worst = work
+            self.iterations += 1
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.period
+        delay = self._deadline - now
+        if delay < 0:
+            self.overruns += 1
+            self._record(-delay)
+            self._deadline = now
+            delay = 0
+        time.sleep(delay)
+        self._wake = time.monotonic()
+        if delay:
+            self._record(self._wake - self._deadline)
+
+    def _record(self, late):
+        k = int(late / self.bin_width) if late > 0 else 0
+        last = len(self.jitter) - 1
+        self.jitter[k if k < last else last] += 1
+
+    def stats(self):
+        """(iterations, overruns, worst iteration s, current period s)"""
+        return self.iterations, self.overruns, self.worst, self.period
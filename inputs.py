@@ -0,0 +1,159 @@
+"""
+Button events
+Edges come from a keypad.Keys scanner, which samples the pins in the
+background, debounces them and timestamps every edge into a bounded queue,
+so presses are not lost while the loop is busy. Buttons turns those edges
+into press, release, click, double-click and long-press events, and the
+main loop drains them with get() instead of polling switch.value.
+
+A plain click can only be reported once the double-click window has
+passed. With speculative=True a press also reports TENTATIVE_CLICK at
+once, so the loop can start the click's action right away, and
+CANCEL_CLICK if a second press (or a long press) shows it wasn't one; the
+loop then rolls the action back. Every event carries the time of the
+press that began its gesture, so LatencyMeter can time press to photon.
+"""
+
+import keypad
+import supervisor
+
+PRESS = 1
+RELEASE = 2
+CLICK = 3  # single click, once the double-click window has passed
+DOUBLE_CLICK = 4
+LONG_PRESS = 5  # still held after long_press seconds; no click follows
+TENTATIVE_CLICK = 6  # speculative: a press that is a click unless cancelled
+CANCEL_CLICK = 7  # speculative: the tentative click turned out not to be one
+
+NAMES = (None, "press", "release", "click", "double-click", "long-press", "tentative-click", "cancel-click")
+
+_TICKS_MASK = (1 << 29) - 1  # supervisor.ticks_ms() wraps at 2**29
+
+
+class Buttons:
+    def __init__(self, pins, double_click, long_press=None, debounce=0.02, max_events=16, speculative=False):
+        """pins are wired to ground with the pull-up on (pressed = low)."""
+        self.keys = keypad.Keys(
+            pins, value_when_pressed=False, pull=True, interval=debounce, max_events=max_events
+        )
+        self.double_click = double_click  # s from first press to second
+        self.long_press = long_press  # s, or None for no long-press events
+        self.max_events = max_events
+        self.speculative = speculative
+        self.queue = []
+        self.dropped = 0  # events lost to a full queue
+        n = len(pins)
+        self._edge = keypad.Event()
+        self._down = [False] * n
+        self._down_t = [0.0] * n
+        self._click_t = [None] * n  # first press of a possible double-click
+        self._long = [False] * n
+
+    # ── queue ─────────────────────────────────────────────────
+    def get(self):
+        """Next (kind, key, t, origin) event, or None. t is when it
+        happened, origin when the press that began the gesture did, both
+        in time.monotonic()."""
+        return self.queue.pop(0) if self.queue else None
+
+    def _put(self, kind, key, t, origin=None):
+        if len(self.queue) >= self.max_events:
+            self.queue.pop(0)
+            self.dropped += 1
+        self.queue.append((kind, key, t, t if origin is None else origin))
+
+    # ── state ─────────────────────────────────────────────────
+    def is_down(self, key):
+        return self._down[key]
+
+    def pending(self, key):
+        """True while a click waits to see if it becomes a double-click."""
+        return self._click_t[key] is not None
+
+    # ── edges → gestures ──────────────────────────────────────
+    def poll(self, now):
+        """Turn queued edges into events, then fire clicks and long
+        presses whose time has come. Call once per loop."""
+        ticks = supervisor.ticks_ms()
+        edge = self._edge
+        events = self.keys.events
+        while events.get_into(edge):
+            t = now - ((ticks - edge.timestamp) & _TICKS_MASK) / 1000
+            if edge.pressed:
+                self._pressed(edge.key_number, t)
+            else:
+                self._released(edge.key_number, t)
+        if events.overflowed:
+            events.clear()  # the flag is read-only; clear() resets it (the queue is empty)
+            self.dropped += 1
+
+        for key in range(len(self._down)):
+            if self._down[key]:
+                if (
+                    self.long_press is not None
+                    and not self._long[key]
+                    and now - self._down_t[key] >= self.long_press
+                ):
+                    self._long[key] = True
+                    if self.speculative and self._click_t[key] is not None:
+                        self._put(CANCEL_CLICK, key, now, self._click_t[key])
+                    self._click_t[key] = None
+                    self._put(LONG_PRESS, key, now, self._down_t[key])
+            elif self._click_t[key] is not None and now - self._click_t[key] >= self.double_click:
+                first = self._click_t[key]
+                self._click_t[key] = None
+                self._put(CLICK, key, now, first)
+
+    def _pressed(self, key, t):
+        self._down[key] = True
+        self._down_t[key] = t
+        self._long[key] = False
+        self._put(PRESS, key, t)
+        first = self._click_t[key]
+        if first is not None and t - first < self.double_click:
+            self._click_t[key] = None
+            if self.speculative:
+                self._put(CANCEL_CLICK, key, t, first)
+            self._put(DOUBLE_CLICK, key, t, first)
+            return
+        if first is not None:  # an earlier click expired while we were busy
+            self._put(CLICK, key, first + self.double_click, first)
+        self._click_t[key] = t
+        if self.speculative:
+            self._put(TENTATIVE_CLICK, key, t)
+
+    def _released(self, key, t):
+        self._down[key] = False
+        self._put(RELEASE, key, t)
+
+
+class LatencyMeter:
+    """Press-to-photon latency: mark() the origin of the event an action
+    answers, and poll() after every output pass; the first frame `output`
+    sends after the mark closes the measurement."""
+
+    def __init__(self, output):
+        self.output = output
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._origin = None
+        self._sent = 0
+
+    def mark(self, origin):
+        self._origin = origin
+        self._sent = self.output.sent
+
+    def poll(self, now):
+        if self._origin is None or self.output.sent == self._sent:
+            return
+        dt = now - self._origin
+        self._origin = None
+        self.count += 1
+        self.total += dt
+        if dt > self.max:
+            self.max = dt
+
+    def stats(self):
+        """(measurements, mean s, max s)"""
+        return self.count, self.total / self.count if self.count else 0.0, self.max
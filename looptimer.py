@@ -0,0 +1,75 @@
+"""
+Loop stage timing
+Splits each pass of a controller loop into named stages and keeps count,
+min, total and max µs per stage in preallocated arrays, so where the loop
+budget goes can be read off a running board. Stages are timed back to
+back: lap(k) charges the time since the previous lap to stage k, one clock
+read per stage. Counters are 32-bit µs; dump with reset (the default)
+often enough that a stage's total stays under ~70 minutes.
+"""
+
+import time
+from array import array
+
+_NEVER = 0xFFFFFFFF
+
+
+def _ticks_us():
+    return time.monotonic_ns() // 1000
+
+
+class StageTimer:
+    def __init__(self, names, dump_period=None):
+        self.names = names
+        self.dump_period = dump_period  # s between poll() dumps, None = on request only
+        n = len(names)
+        self.count = array("L", [0] * n)
+        self.min = array("L", [_NEVER] * n)
+        self.total = array("L", [0] * n)
+        self.max = array("L", [0] * n)
+        self._t = _ticks_us()
+        self._dumped = None
+
+    def lap(self, stage):
+        """Charge the time since the last lap to `stage` (an index into names)."""
+        t = _ticks_us()
+        dt = t - self._t
+        self._t = t
+        self.count[stage] += 1
+        self.total[stage] += dt
+        if dt < self.min[stage]:
+            self.min[stage] = dt
+        if dt > self.max[stage]:
+            self.max[stage] = dt
+
+    def poll(self, now):
+        """dump() every dump_period s; the time spent printing is not charged
+        to the next stage."""
+        if self.dump_period is None:
+            return
+        if self._dumped is None:
+            self._dumped = now
+        elif now - self._dumped >= self.dump_period:
+            self._dumped = now
+            self.dump()
+            self._t = _ticks_us()
+
+    def stats(self, stage):
+        """(count, min µs, mean µs, max µs) of one stage."""
+        n = self.count[stage]
+        if not n:
+            return 0, 0, 0, 0
+        return n, self.min[stage], self.total[stage] // n, self.max[stage]
+
+    def dump(self, reset=True):
+        for k in range(len(self.names)):
+            print("stage", self.names[k], "n / min / mean / max µs:", *self.stats(k))
+        if reset:
+            self.reset()
+
+    def reset(self):
+        for k in range(len(self.names)):
+            self.count[k] = 0
+            self.min[k] = _NEVER
+            self.total[k] = 0
+            self.max[k] = 0
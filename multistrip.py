@@ -0,0 +1,141 @@
+"""
+Several strips, one frame
+A StripSet owns every chain on the vehicle (interior, destination sign,
+marker lights, …). Each Strip has its own framebuffer, its own Output and
+its own mode, and the set renders them all from the same animation time.
+
+Transmission is either serial, a NeoPixel per pin sent one after another,
+so frame time is the sum of the strips, or parallel, all strips as strands
+of one adafruit_neopxl8 object (RP2040 PIO) sent at once, so frame time is
+that of the longest strip. Parallel falls back to serial on boards without
+NeoPxl8. In parallel mode a strip's show() only marks the set pending and
+flush() sends every strand in one transmission. NeoPxl8 sends by DMA in
+the background, so parallel mode also overlaps transmission with the
+rendering of the next frame, even for a single strip.
+"""
+
+import neopixel
+
+import pixbuf
+from output import Output, TxTimer, tx_time_ns
+from vecbuf import fill
+
+
+class _Strand:
+    """The pixelbuf surface Output expects, writing into one strand of the
+    shared NeoPxl8 buffer. show() defers to StripSet.flush()."""
+
+    def __init__(self, owner, start, num_pixels):
+        self.owner = owner
+        self.start = start
+        self.stop = start + num_pixels
+
+    def __setitem__(self, index, value):
+        self.owner.pixels[self.start : self.stop] = value  # whole strand, flat bytes
+
+    def show(self):
+        self.owner.pending = True
+
+
+class Strip:
+    def __init__(self, name, pin, num_pixels, pixels, render=None, timer=None, tone=None):
+        self.name = name
+        self.pin = pin
+        self.num_pixels = num_pixels
+        self.frame = pixbuf.frame(num_pixels)
+        self.out = Output(pixels, num_pixels, timer, tone)  # skips show() for unchanged frames
+        self.render = render  # render(t, buf) like FinV4's modes; None = owned elsewhere
+
+    def show(self, dirty=None):
+        return self.out.show(self.frame, dirty)
+
+
+class StripSet:
+    def __init__(self, strips, parallel=False, brightness=1.0, tone=None, timed=False):
+        """strips: (name, pin, num_pixels) per chain. With parallel=True the
+        pins must be consecutive GPIOs starting at the first strip's pin.
+        `tone` (a tone.ToneMap) is shared by every strip's Output. timed=True
+        puts a TxTimer on every transmission, for tx_stats()."""
+        self.strips = []
+        self.pixels = None  # the NeoPxl8 when parallel
+        self.pending = False
+        self.transmissions = 0
+        self.parallel = False
+        self.timer = None  # TxTimer of the parallel transmission
+        self.timed = timed
+        if parallel:
+            try:
+                from adafruit_neopxl8 import NeoPxl8
+
+                self.parallel = True
+            except ImportError:
+                pass
+        if self.parallel:
+            strand = max(n for _, _, n in strips)
+            self.strand_length = strand
+            if timed:
+                self.timer = TxTimer(tx_time_ns(strand))
+            self.pixels = NeoPxl8(
+                strips[0][1], strand * len(strips), num_strands=len(strips), brightness=brightness, auto_write=False
+            )
+            for k, (name, pin, n) in enumerate(strips):
+                self.strips.append(Strip(name, pin, n, _Strand(self, k * strand, n), tone=tone))
+        else:
+            for name, pin, n in strips:
+                pixels = neopixel.NeoPixel(pin, n, brightness=brightness, auto_write=False)
+                timer = TxTimer(tx_time_ns(n)) if timed else None
+                self.strips.append(Strip(name, pin, n, pixels, timer=timer, tone=tone))
+
+    def __getitem__(self, name):
+        for strip in self.strips:
+            if strip.name == name:
+                return strip
+        raise KeyError(name)
+
+    def render(self, t, on=True):
+        """Render and show every strip that has a mode, at animation time
+        `t`; with on=False they go dark. Strips without a render function
+        are left to their owner."""
+        for strip in self.strips:
+            if strip.render is None:
+                continue
+            if on:
+                strip.show(strip.render(t, strip.frame))
+            else:
+                fill(strip.frame, (0, 0, 0))
+                strip.show()
+
+    def flush(self):
+        """Send the pending strands in one parallel transmission (no-op
+        when serial: each strip was sent by its own show()). Returns True
+        if something went out."""
+        if not self.pending:
+            return False
+        self.pending = False
+        if self.timer is None:
+            self.pixels.show()
+        else:
+            t0 = self.timer.start()
+            self.pixels.show()
+            self.timer.stop(t0)
+        self.transmissions += 1
+        return True
+
+    def tx_stats(self):
+        """(frames, overlap, peak fps) of the transmission that bounds the
+        frame rate: the parallel one, or the busiest serial strip. None
+        unless the set is timed."""
+        if not self.timed:
+            return None
+        if self.parallel:
+            return self.timer.stats()
+        busiest = max(self.strips, key=lambda s: s.out.timer.frames * s.out.timer.tx_ns)
+        return busiest.out.timer.stats()
+
+    def stats(self):
+        """(transmissions, ((name, sent, skipped), …)); serially every
+        frame a strip sends is a transmission of its own."""
+        sent = tuple((s.name, s.out.sent, s.out.skipped) for s in self.strips)
+        tx = self.transmissions if self.parallel else sum(s[1] for s in sent)
+        return tx, sent
+
@@ -0,0 +1,112 @@
+"""
+Strip output stage
+Every frame goes to the hardware through an Output, which remembers the last
+frame it transmitted and skips show() when nothing changed.
+
+The frame a mode renders into is the back buffer; the driver's own buffer
+is the front one. A bit-banged NeoPixel blocks in show() for the whole
+transmission, while a DMA/PIO driver (NeoPxl8 on the RP2040) returns at
+once and only waits if the previous frame is still going out, so the next
+frame renders while this one is sent. A TxTimer measures how much of the
+transmission was hidden that way and the fastest frame rate reached.
+"""
+
+import time
+
+import pixbuf
+from pixbuf import BPP
+
+# WS2812 timing: 24 bits × 1.25 µs per pixel, plus the >50 µs latch
+PIXEL_TIME_NS = 30000
+LATCH_TIME_NS = 80000
+
+
+def tx_time_ns(num_pixels):
+    """Time one frame of num_pixels takes on the wire."""
+    return num_pixels * PIXEL_TIME_NS + LATCH_TIME_NS
+
+
+class TxTimer:
+    def __init__(self, tx_ns):
+        self.tx_ns = tx_ns  # wire time per frame
+        self.frames = 0
+        self.blocked_ns = 0  # time spent inside show()
+        self.min_interval_ns = None  # shortest gap between two frames going out
+        self._last = None
+
+    def start(self):
+        return time.monotonic_ns()
+
+    def stop(self, t0):
+        # show() returns once the frame is on its way: after the whole
+        # transmission when blocking, after the previous one when not
+        now = time.monotonic_ns()
+        self.blocked_ns += now - t0
+        self.frames += 1
+        if self._last is not None:
+            gap = now - self._last
+            if self.min_interval_ns is None or gap < self.min_interval_ns:
+                self.min_interval_ns = gap
+        self._last = now
+
+    @property
+    def overlap(self):
+        """Fraction of wire time that ran behind other work (0 when
+        show() blocks for the whole transmission)."""
+        wire = self.frames * self.tx_ns
+        if not wire:
+            return 0.0
+        return max(0, wire - self.blocked_ns) / wire
+
+    @property
+    def peak_fps(self):
+        if not self.min_interval_ns:
+            return 0.0
+        return 1e9 / self.min_interval_ns
+
+    def stats(self):
+        return self.frames, self.overlap, self.peak_fps
+
+
+class Output:
+    def __init__(self, pixels, num_pixels, timer=None, tone=None):
+        self.pixels = pixels
+        self.timer = timer  # TxTimer, or None to leave show() untimed
+        self.tone = tone  # tone.ToneMap applied on the way out, or None
+        self.wire = bytearray(num_pixels * BPP) if tone is not None else None
+        self._dithering = False  # last frame sent needs re-sending
+        self.last = bytearray(num_pixels * BPP)  # last frame on the wire
+        self.valid = False  # False → `last` can't be trusted, always send
+        self.sent = 0
+        self.skipped = 0
+
+    def show(self, buf, dirty=None):
+        """Transmit `buf` unless it matches the last frame sent.
+        A mode that knows better can pass dirty=True/False to skip the
+        compare. Returns True if the frame went out."""
+        if dirty is None:
+            dirty = not self.valid or buf != self.last
+        if not dirty and not self._dithering:
+            self.skipped += 1
+            return False
+        wire = buf
+        if self.tone is not None:
+            self._dithering = self.tone.apply(self.wire, buf)
+            wire = self.wire
+        if self.timer is None:
+            pixbuf.show(self.pixels, wire)
+        else:
+            t0 = self.timer.start()
+            pixbuf.show(self.pixels, wire)
+            self.timer.stop(t0)
+        self.last[:] = buf
+        self.valid = True
+        self.sent += 1
+        return True
+
+    def invalidate(self):
+        """Call after anything wrote to the strip behind our back."""
+        self.valid = False
+
+    def stats(self):
+        return self.sent, self.skipped
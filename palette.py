@@ -0,0 +1,94 @@
+"""
+Precomputed colour palettes
+A palette is a 256-entry colour table packed into one bytearray, built once
+at startup. Palette modes then cost a table copy per frame, however
+expensive the colour function behind the table is.
+"""
+
+import vecbuf
+from pixbuf import BPP
+
+SIZE = 256  # entries per palette; indices wrap with & 255
+
+
+class Palette:
+    def __init__(self, color_fn):
+        self.lut = bytearray(SIZE * BPP)
+        for k in range(SIZE):
+            r, g, b = color_fn(k)
+            self.lut[k * BPP] = r
+            self.lut[k * BPP + 1] = g
+            self.lut[k * BPP + 2] = b
+        self._num_pixels = 0
+        self._work = None
+
+    def color(self, index):
+        i = (index & 255) * BPP
+        return self.lut[i], self.lut[i + 1], self.lut[i + 2]
+
+    def fill(self, buf, index):
+        """Whole frame in entry `index`."""
+        if vecbuf.vector(len(buf) // BPP):
+            vecbuf.fill(buf, self.color(index))
+            return
+        i = (index & 255) * BPP
+        r, g, b = self.lut[i], self.lut[i + 1], self.lut[i + 2]
+        for j in range(0, len(buf), BPP):
+            buf[j] = r
+            buf[j + 1] = g
+            buf[j + 2] = b
+
+    def spread(self, buf, offset):
+        """Palette stretched once along the strip, rotated by `offset`:
+        pixel i shows entry (i * 256 // n + offset) & 255."""
+        n = len(buf) // BPP
+        if n != self._num_pixels:
+            self._layout(n)
+        offset &= 255
+        if self._work is not None:  # whole-array gather
+            work = self._work
+            work[:] = self._index
+            work += offset
+            work &= 255
+            vecbuf.gather(buf, self.lut, work)
+            return
+        if self._rows is None:
+            lut, index = self.lut, self._index
+            for p in range(n):
+                i = ((index[p] + offset) & 255) * BPP
+                j = p * BPP
+                buf[j] = lut[i]
+                buf[j + 1] = lut[i + 1]
+                buf[j + 2] = lut[i + 2]
+            return
+        # offset = q * stride + r: rotating by `stride` entries is rotating
+        # by one pixel, so the frame is a window into row r
+        q, r = divmod(offset, self._stride)
+        buf[:] = self._rows[r][q * BPP : (q + n) * BPP]
+
+    def _layout(self, n):
+        """Strip-resampled copies of the table, built once per strip length.
+        When n divides 256 every frame is one contiguous slice of one of
+        `stride` rows, each holding two laps of the strip (2 × 768 bytes in
+        total). Other lengths use a per-pixel index table, gathered as one
+        array operation when vecbuf can handle the strip."""
+        self._num_pixels = n
+        self._rows = None
+        self._index = None
+        self._work = None
+        if n and SIZE % n == 0:
+            stride = SIZE // n
+            self._stride = stride
+            self._rows = []
+            for r in range(stride):
+                row = bytearray(2 * n * BPP)
+                for k in range(2 * n):
+                    i = ((k * stride + r) & 255) * BPP
+                    row[k * BPP : k * BPP + BPP] = self.lut[i : i + BPP]
+                self._rows.append(memoryview(row))
+        else:
+            self._index = bytearray((p * SIZE // n) & 255 for p in range(n))
+            if vecbuf.vector(n):
+                np = vecbuf.np
+                self._index = np.frombuffer(self._index, dtype=np.uint8)
+                self._work = np.zeros(n, dtype=vecbuf.INDEX)
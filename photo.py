@@ -0,0 +1,296 @@
+"""
+Photocell filtering
+A constant-memory streaming stage between the ADC and the on/off
+hysteresis: oversampled reads feed a running median over an array('H')
+ring buffer, followed by an EMA. It samples at its own rate, so the loop
+can call poll() as often as it likes. Noise near dusk no longer flaps the
+lights, and the filter counts the flips it swallowed. BufferedPhotocell
+feeds it whole blocks of conversions, so the ADC is touched a few times a
+second rather than on every loop.
+"""
+
+from array import array
+
+FALLBACK_SAMPLES = 4  # AnalogIn reads per value without analogbufio
+
+
+class BufferedPhotocell:
+    """Bulk photocell acquisition, usable wherever an AnalogIn is: each
+    .value read fills a reused array('H') with `samples` conversions in one
+    analogbufio.BufferedIn.readinto() call and returns their mean. On boards
+    without analogbufio a value is the mean of a few AnalogIn reads, as each
+    one is a blocking conversion."""
+
+    def __init__(self, pin, samples, sample_rate, shift=0):
+        self.buf = array("H", [0] * samples)
+        self.shift = shift  # left shift to 16-bit, for ports that fill raw 12-bit values
+        self.blocks = 0
+        try:
+            import analogbufio
+
+            self._bufin = analogbufio.BufferedIn(pin, sample_rate=sample_rate)
+            self._adc = None
+        except (ImportError, NotImplementedError, ValueError):
+            import analogio
+
+            self._bufin = None
+            self._adc = analogio.AnalogIn(pin)
+
+    @property
+    def buffered(self):
+        return self._bufin is not None
+
+    @property
+    def value(self):
+        buf = self.buf
+        if self._bufin is not None:
+            self._bufin.readinto(buf)
+        else:
+            adc = self._adc
+            total = 0
+            for _ in range(FALLBACK_SAMPLES):
+                total += adc.value
+            self.blocks += 1
+            return total // FALLBACK_SAMPLES  # AnalogIn is 16-bit already
+        self.blocks += 1
+        return (sum(buf) // len(buf)) << self.shift
+
+
+class PhotoFilter:
+    def __init__(self, adc, on_threshold, off_threshold, period, oversample=4, window=9, ema_shift=3):
+        """Dark (lights wanted) below on_threshold, light again above
+        off_threshold. window should be odd."""
+        self.adc = adc
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.period = period  # s between samples
+        self.oversample = oversample
+        self.ema_shift = ema_shift  # EMA weight 1 / 2**ema_shift
+        self.ring = array("H", [0] * window)
+        self._sorted = array("H", [0] * window)
+        self._pos = 0
+        self._next = None
+
+        raw = self._read()
+        for i in range(window):  # start settled on the first reading
+            self.ring[i] = raw
+            self._sorted[i] = raw
+        self.raw = raw  # last oversampled reading
+        self.median = raw
+        self._ema = raw << 8  # EMA in 8.8 fixed point
+        self.value = raw  # filtered output
+        self.dark = raw < on_threshold
+        self._raw_dark = self.dark
+        self.samples = 0
+        self.flips = 0  # filtered state changes
+        self.raw_flips = 0  # changes the raw reading alone would have made
+
+    @property
+    def prevented(self):
+        return max(0, self.raw_flips - self.flips)
+
+    def poll(self, now):
+        """Take a sample if one is due. Returns True if it did."""
+        if self._next is not None and now < self._next:
+            return False
+        self._next = now + self.period
+        self.sample()
+        return True
+
+    def sample(self):
+        raw = self._read()
+        self.raw = raw
+        self._push(raw)
+        self.median = self._sorted[len(self._sorted) // 2]
+        self._ema += ((self.median << 8) - self._ema) >> self.ema_shift
+        self.value = self._ema >> 8
+        self.samples += 1
+
+        dark = self._hysteresis(self.dark, self.value)
+        if dark != self.dark:
+            self.dark = dark
+            self.flips += 1
+        raw_dark = self._hysteresis(self._raw_dark, raw)
+        if raw_dark != self._raw_dark:
+            self._raw_dark = raw_dark
+            self.raw_flips += 1
+
+    def stats(self):
+        return self.value, self.raw, self.flips, self.raw_flips, self.prevented
+
+    # ── internals ─────────────────────────────────────────────
+    def _read(self):
+        adc = self.adc
+        total = 0
+        for _ in range(self.oversample):
+            total += adc.value
+        return total // self.oversample
+
+    def _hysteresis(self, dark, value):
+        if dark:
+            return value <= self.off_threshold
+        return value < self.on_threshold
+
+    def _push(self, value):
+        """Replace the oldest ring entry and keep _sorted in order, with
+        one shift pass each way – no allocation, O(window)."""
+        ring, s, n = self.ring, self._sorted, len(self.ring)
+        old = ring[self._pos]
+        ring[self._pos] = value
+        self._pos = (self._pos + 1) % n
+
+        i = 0  # drop `old` from the sorted copy
+        while s[i] != old:
+            i += 1
+        while i < n - 1:
+            s[i] = s[i + 1]
+            i += 1
+        i = n - 1  # insert `value`, shifting larger entries up
+        while i > 0 and s[i - 1] > value:
+            s[i] = s[i - 1]
+            i -= 1
+        s[i] = value
+
+
+class Calibrator:
+    """Learns the night and day light levels from live readings and derives
+    the ON/OFF hysteresis band from them, in constant memory: a fixed-bin
+    histogram (array('H')) that halves itself whenever a bin saturates, so
+    old seasons fade out. The histogram is persisted to `nvm`
+    (microcontroller.nvm) so the learned levels survive a reboot."""
+
+    MAGIC = b"PC1"
+
+    def __init__(
+        self,
+        period,
+        save_period,
+        bins=64,
+        night_q=0.10,
+        day_q=0.90,
+        on_frac=0.30,
+        off_frac=0.45,
+        min_spread=4000,
+        min_samples=360,
+        nvm=None,
+        nvm_offset=0,
+    ):
+        self.period = period  # s between histogram samples
+        self.save_period = save_period  # s between nvm writes (flash wear)
+        self.hist = array("H", [0] * bins)
+        self.total = 0
+        self.night_q = night_q
+        self.day_q = day_q
+        self.on_frac = on_frac  # ON threshold, as a fraction night → day
+        self.off_frac = off_frac
+        self.min_spread = min_spread  # day - night needed to trust the levels
+        self.min_samples = min_samples
+        self.nvm = nvm
+        self.nvm_offset = nvm_offset
+        self._shift = 16 - (bins.bit_length() - 1)  # value → bin, bins a power of 2
+        self._next = None
+        self._next_save = None
+        self.saves = 0
+
+    # ── learning ──────────────────────────────────────────────
+    def poll(self, now, value):
+        """Add `value` if a sample is due; save to nvm when that is due.
+        Returns True if a sample was taken."""
+        if self._next is not None and now < self._next:
+            return False
+        self._next = now + self.period
+        self.add(value)
+        if self._next_save is None:
+            self._next_save = now + self.save_period
+        elif now >= self._next_save:
+            self._next_save = now + self.save_period
+            self.save()
+        return True
+
+    def add(self, value):
+        hist = self.hist
+        b = value >> self._shift
+        hist[b] += 1
+        self.total += 1
+        if hist[b] == 65535:  # saturated: age everything by half
+            total = 0
+            for i in range(len(hist)):
+                hist[i] >>= 1
+                total += hist[i]
+            self.total = total
+
+    def quantile(self, q):
+        """Centre of the bin holding the q-quantile of what has been seen."""
+        target = q * self.total
+        seen = 0
+        width = 1 << self._shift
+        for i in range(len(self.hist)):
+            seen += self.hist[i]
+            if seen >= target and seen:
+                return i * width + width // 2
+        return 65535
+
+    def levels(self):
+        return self.quantile(self.night_q), self.quantile(self.day_q)
+
+    @property
+    def calibrated(self):
+        if self.total < self.min_samples:
+            return False
+        night, day = self.levels()
+        return day - night >= self.min_spread
+
+    def thresholds(self):
+        """(on, off) from the learned levels, or None until calibrated."""
+        if not self.calibrated:
+            return None
+        night, day = self.levels()
+        spread = day - night
+        return int(night + spread * self.on_frac), int(night + spread * self.off_frac)
+
+    def apply(self, photo_filter):
+        """Move a PhotoFilter's thresholds to the learned band.
+        Returns True if they were changed."""
+        band = self.thresholds()
+        if band is None or band == (photo_filter.on_threshold, photo_filter.off_threshold):
+            return False
+        photo_filter.on_threshold, photo_filter.off_threshold = band
+        return True
+
+    # ── persistence ───────────────────────────────────────────
+    def _payload(self):
+        data = bytearray(self.MAGIC)
+        for count in self.hist:
+            data.append(count & 255)
+            data.append(count >> 8)
+        return data
+
+    def save(self):
+        """Write the histogram to nvm, only if it changed (flash wear)."""
+        if self.nvm is None:
+            return False
+        data = self._payload()
+        start, end = self.nvm_offset, self.nvm_offset + len(data)
+        if self.nvm[start:end] == data:
+            return False
+        self.nvm[start:end] = data  # one slice write = one flash write
+        self.saves += 1
+        return True
+
+    def load(self):
+        """Restore a histogram saved by an earlier boot. Returns True if
+        one was found."""
+        if self.nvm is None:
+            return False
+        n = len(self.hist)
+        start = self.nvm_offset
+        data = self.nvm[start : start + len(self.MAGIC) + 2 * n]
+        if data[: len(self.MAGIC)] != self.MAGIC:
+            return False
+        total = 0
+        for i in range(n):
+            j = len(self.MAGIC) + 2 * i
+            self.hist[i] = data[j] | (data[j + 1] << 8)
+            total += self.hist[i]
+        self.total = total
+        return True
@@ -0,0 +1,46 @@
+"""
+Preallocated RGB framebuffers
+A frame is a flat bytearray (r, g, b, r, g, b, …) that is written in place,
+so rendering and blending never build per-pixel tuples. Blend and scale
+factors are 8.8 fixed point: 0 is 0.0 and ONE (256) is 1.0.
+"""
+
+BPP = 3  # bytes per pixel
+ONE = 256  # 1.0 in 8.8 fixed point
+
+
+def frame(num_pixels):
+    return bytearray(num_pixels * BPP)
+
+
+def fill(buf, color, level=ONE):
+    r = (color[0] * level) >> 8
+    g = (color[1] * level) >> 8
+    b = (color[2] * level) >> 8
+    for i in range(0, len(buf), BPP):
+        buf[i] = r
+        buf[i + 1] = g
+        buf[i + 2] = b
+
+
+def set_pixel(buf, index, color):
+    i = index * BPP
+    buf[i] = color[0]
+    buf[i + 1] = color[1]
+    buf[i + 2] = color[2]
+
+
+def copy(dst, src):
+    dst[:] = src
+
+
+def blend(dst, a, b, t):
+    """dst = a + (b - a) * t, with t in 8.8 fixed point (0 … ONE)."""
+    u = ONE - t
+    for i in range(len(dst)):
+        dst[i] = (a[i] * u + b[i] * t) >> 8
+
+
+def show(pixels, buf):
+    pixels[:] = buf  # flat slice assignment, no per-pixel tuples
+    pixels.show()
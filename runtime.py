@@ -0,0 +1,35 @@
+"""
+asyncio runtime
+Runs a controller as independent periodic tasks – input at a high rate,
+sensors at a low rate, rendering at the frame rate – instead of one loop
+doing everything at the same rate. The tasks share state through the
+controller's globals and the button event queue.
+"""
+
+import asyncio
+import time
+
+
+async def periodic(period, *stages):
+    """Call each stage(now) every `period` s on a fixed schedule. An
+    overrun restarts the schedule rather than bursting to catch up."""
+    deadline = time.monotonic()
+    while True:
+        now = time.monotonic()
+        for stage in stages:
+            stage(now)
+        deadline += period
+        delay = deadline - time.monotonic()
+        if delay < 0:
+            deadline = time.monotonic()
+            delay = 0
+        await asyncio.sleep(delay)
+
+
+async def _main(tasks):
+    await asyncio.gather(*[asyncio.create_task(periodic(*task)) for task in tasks])
+
+
+def run(*tasks):
+    """run((period, stage, …), …) – one asyncio task per tuple. Never returns."""
+    asyncio.run(_main(tasks))
@@ -0,0 +1,62 @@
+"""
+Simulated `adafruit_neopxl8`
+NeoPxl8 drives up to 8 strands from one buffer through RP2040 PIO, all at
+once: strand k is pixels [k × strand_length, (k + 1) × strand_length) and
+goes out on the k-th pin from data0. A show() therefore takes as long as
+one strand, not the whole buffer.
+
+The transfer runs by DMA in the background: show() hands the frame over and
+returns, and only the next show() waits (charges the clock) if the wire is
+still busy. Here a worker thread stands in for the DMA engine and does the
+wire encoding and recording off the script's thread. Reading `shows`
+waits for it to catch up. The recorded frames hold every strand, stamped
+with the virtual time their transmission started.
+"""
+
+import queue
+import threading
+
+import neopixel
+import simhw
+
+
+class NeoPxl8(neopixel.NeoPixel):
+    def __init__(self, data0, n, *, num_strands=8, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
+        if n % num_strands:
+            raise ValueError("n must be a multiple of num_strands")
+        self._queue = queue.Queue()
+        super().__init__(data0, n, bpp=bpp, brightness=brightness, auto_write=auto_write, pixel_order=pixel_order)
+        self.num_strands = num_strands
+        self.strand_length = n // num_strands
+        self.tx_time = self.strand_length * simhw.PIXEL_TIME + simhw.LATCH_TIME
+        self.waited = 0.0  # s show() spent waiting for the previous frame
+        self._done = 0.0  # virtual time the frame on the wire is sent by
+        threading.Thread(target=self._dma, daemon=True).start()
+
+    @property
+    def shows(self):
+        self._queue.join()
+        return self._shows
+
+    @shows.setter
+    def shows(self, value):
+        self._shows = value
+
+    def show(self):
+        clock = simhw.clock
+        wait = self._done - clock.now
+        if wait > 0:
+            self.waited += wait
+            clock.spend(wait)  # previous frame still going out
+        self.show_count += 1
+        self.busy += self.tx_time
+        self._done = clock.now + self.tx_time
+        if simhw.recording:
+            self._queue.put((clock.now, bytes(self._buf), self._brightness))
+
+    def _dma(self):
+        while True:
+            t, buf, k = self._queue.get()
+            wire = bytes(int(c * k) for c in buf) if k < 1.0 else buf
+            self._shows.append((t, wire))
+            self._queue.task_done()
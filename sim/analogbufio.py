@@ -0,0 +1,33 @@
+"""
+Simulated `analogbufio`
+BufferedIn.readinto() samples the pin's scripted simhw.Signal at
+sample_rate from the current virtual time on, and blocks the CPU (charges
+the clock) for as long as the real conversion would take.
+"""
+
+import simhw
+
+
+class BufferedIn:
+    def __init__(self, pin, *, sample_rate):
+        self.pin = pin
+        self.sample_rate = sample_rate
+
+    def readinto(self, buffer, *, loop=False):
+        signal = simhw.analog(self.pin)
+        t0 = simhw.clock.monotonic()
+        dt = 1 / self.sample_rate
+        for i in range(len(buffer)):
+            v = int(signal.value(t0 + i * dt))
+            buffer[i] = 0 if v < 0 else 65535 if v > 65535 else v
+        simhw.clock.spend(len(buffer) * dt)
+        return len(buffer)
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
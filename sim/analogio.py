@@ -0,0 +1,24 @@
+"""Simulated `analogio`: AnalogIn reads the pin's scripted simhw.Signal."""
+
+import simhw
+
+
+class AnalogIn:
+    reference_voltage = 3.3
+
+    def __init__(self, pin):
+        self.pin = pin
+
+    @property
+    def value(self):
+        v = int(simhw.analog(self.pin).value())
+        return 0 if v < 0 else 65535 if v > 65535 else v
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
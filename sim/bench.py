@@ -0,0 +1,364 @@
+"""
+Per-frame benchmarks on the host simulator.
+
+    python sim/bench.py                      # FinV4, FinV3 and Ashton
+    python sim/bench.py FinV4.py --frames 2000 --out v4.json
+    python sim/bench.py --baseline v3.json   # print ratios against an older run
+    python sim/bench.py render               # render backends at 8 / 300 / 5000 px
+    python sim/bench.py strips               # 1 … 8 strips, serial vs parallel
+    python sim/bench.py tx                   # blocking vs background transmission
+
+Every target is run frame by frame, once for timing and once under
+tracemalloc. For each one the JSON report holds:
+- frame time mean / p99 / max (host CPU, seconds)
+- blocked: virtual time the frame spent in hardware (strip transmission,
+  sleeps inside the target)
+- alloc_peak_bytes: mean transient heap high-water per frame, less what
+  the harness itself allocates around an empty frame (0 = allocation-free)
+- live_blocks: mean heap blocks a frame leaves alive (leaks / growth), also
+  less the harness; blocks allocated and freed within a frame don't show
+- fps: loop rate the frame allows: with FinV4's frame governor, its period
+  for that mode or effect unless the work overruns it; for the other
+  scripts, the work plus the nominal 10 ms sleep
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import run  # sets up sys.path for the stand-ins
+import simhw
+
+LOOP_PERIOD = 0.01  # s, fixed time.sleep() per loop of scripts without a frame governor
+
+
+# ─────────────────────── MEASURE ──────────────────────────────
+def measure(fn, frames, period=None):
+    """Run fn(i) for i in range(frames), twice. Returns the stats dict. With
+    `period` the loop sleeps to a deadline every period s (FinV4's frame
+    governor), otherwise for LOOP_PERIOD after its work."""
+    clock = simhw.clock
+    cpu = []
+    blocked = 0.0
+    for i in range(frames):
+        v0 = clock.now
+        t0 = time.perf_counter()
+        fn(i)
+        cpu.append(time.perf_counter() - t0)
+        blocked += clock.now - v0
+
+    peak, live = _heap(fn, frames, frames)
+    idle_peak, idle_live = _heap(_idle, frames, 0)
+
+    cpu.sort()
+    mean = sum(cpu) / frames
+    blocked /= frames
+    if period is None:
+        fps = 1.0 / (LOOP_PERIOD + mean + blocked)
+        nominal = 1.0 / LOOP_PERIOD
+    else:
+        fps = 1.0 / max(period, mean + blocked)
+        nominal = 1.0 / period
+    return {
+        "frames": frames,
+        "mean": mean,
+        "p99": cpu[min(frames - 1, int(frames * 0.99))],
+        "max": cpu[-1],
+        "blocked": blocked,
+        "alloc_peak_bytes": max(0.0, peak - idle_peak),
+        "live_blocks": max(0.0, live - idle_live),
+        "fps": fps,
+        "nominal_fps": nominal,
+    }
+
+
+def _idle(i):
+    pass
+
+
+def _heap(fn, frames, start):
+    """(mean heap high-water per frame, mean blocks left alive per frame)
+    of fn(start) … fn(start + frames - 1), under tracemalloc."""
+    peak = 0
+    simhw.recording = False  # the sink's frame copies aren't the target's
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(frames):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(start + i)
+        peak += tracemalloc.get_traced_memory()[1] - base
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    simhw.recording = True
+    live = sum(s.count_diff for s in after.compare_to(before, "filename"))
+    return peak / frames, live / frames
+
+
+class EffectFrames:
+    """Drives an effects.Effect one frame per call, `dt` virtual seconds
+    apart, restarting it whenever it finishes."""
+
+    def __init__(self, effect, dt):
+        self.effect = effect
+        self.dt = dt
+        self.now = 0.0
+        effect.start(self.now)
+
+    def __call__(self, i):
+        self.now += self.dt
+        if not self.effect.step(self.now):
+            self.effect.start(self.now)
+
+
+def load(script):
+    simhw.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = run.load(script)
+    simhw.clock.until = None
+    simhw.clock.install()  # targets that sleep keep running on virtual time
+    return env
+
+
+# ─────────────────────── TARGETS ──────────────────────────────
+def finv4(frames):
+    env = load("FinV4.py")
+    frame, show, modes = env["frame"], env["show"], env["MODES"]
+    governor = env["governor"]  # loop periods as FinV4 paces them
+
+    def loop_period(fps):
+        governor.set_fps(fps)
+        return governor.period
+
+    fx_period = loop_period(env["FX_FPS"])
+    results = {}
+    for name, render in modes:
+        period = 1 / env["ANIM_FPS"]
+        results["mode:" + name] = measure(
+            lambda i, r=render: show(r(i * period, frame)), frames, loop_period(env["MODE_FPS"].get(name, 0))
+        )
+
+    cache = env["frames"]  # baked whether or not BAKE_MODES is on
+    for name, render in modes:
+        if name in env["PERIODIC"]:
+            rate, steps = env["PERIODIC"][name]
+            baked = cache.get(name, render, rate, steps, len(frame))
+            for i in range(int(steps / rate / period) + 2):  # record one period first
+                baked(i * period, frame)
+            results["baked:" + name] = measure(
+                lambda i, r=baked: show(r(i * period, frame)), frames, loop_period(env["MODE_FPS"][name])
+            )
+
+    capture = env["capture"]
+    results["capture"] = measure(lambda i: capture(i % len(modes)), frames, fx_period)
+
+    target = bytearray(capture(0))  # fade into Default, from black
+    fade = env["fade"](env["OFF_FRAME"], target)
+    results["fade"] = measure(EffectFrames(fade, env["FADE_DELAY"]), frames, fx_period)
+
+    mode_render = env["mode_render"]
+    crossfade = env["crossfade"](mode_render(len(modes) - 2), mode_render(len(modes) - 1))  # Breathe → Rainbow
+    results["crossfade"] = measure(EffectFrames(crossfade, env["FADE_DELAY"]), frames, fx_period)
+
+    blink = env["blink"](env["GREEN_OK"])
+    results["blink"] = measure(EffectFrames(blink, fx_period), frames, fx_period)
+    return results
+
+
+def finv3(frames):
+    env = load("FinV3.py")
+    on, off = env["set_simple_pattern_on"], env["set_pixels_off"]
+    results = {
+        "pattern_on": measure(lambda i: on(), frames),
+        "pattern_off": measure(lambda i: off(), frames),
+    }
+
+    fx, delay = env["fx"], env["MAIN_LOOP_DELAY"]
+
+    def alert(i):  # one FinV3 loop tick while alerts play back to back
+        if not fx.tick(i * delay):
+            env["photoAlert"]()
+
+    results["photoAlert"] = measure(alert, frames)
+    return results
+
+
+def ashton(frames):
+    env = load("Ashton.py")
+    reveal = EffectFrames(env["reveal"], env["revealDelay"])  # one step per loop
+    return {"reveal": measure(reveal, frames)}
+
+
+def render(frames):
+    """fill / blend / rainbow / breathe at several strip lengths, through
+    the per-pixel loops and through vecbuf's array path (when NumPy is
+    installed), plus the output tone tables. Pure rendering, no strip
+    transmission."""
+    import palette
+    import pixbuf
+    import tone
+    import vecbuf
+
+    env = load("FinV4.py")
+    wheel, breath_color = env["wheel"], env["breath_color"]
+    backends = ["bytes"] + (["vector"] if vecbuf.np is not None else [])
+    saved = vecbuf.MIN_PIXELS
+    results = {}
+    for n in RENDER_SIZES:
+        for backend in backends:
+            vecbuf.MIN_PIXELS = 0 if backend == "vector" else n + 1
+            rainbow, breath = palette.Palette(wheel), palette.Palette(breath_color)
+            buf, a, b = pixbuf.frame(n), pixbuf.frame(n), pixbuf.frame(n)
+            vecbuf.fill(b, (255, 150, 80))
+            key = "{}px {}:".format(n, backend)
+            results[key + "fill"] = measure(lambda i: vecbuf.fill(buf, (255, 150, 80), i & 255), frames)
+            results[key + "blend"] = measure(lambda i: vecbuf.blend(buf, a, b, i & 255), frames)
+            results[key + "rainbow"] = measure(lambda i: rainbow.spread(buf, i), frames)
+            results[key + "breathe"] = measure(lambda i: breath.fill(buf, i), frames)
+            wire = pixbuf.frame(n)
+            for dither in (False, True):
+                tm = tone.ToneMap(2.2, 1.0, dither)
+                breath.fill(buf, 40)  # dim enough to dither
+                name = key + ("tone+dither" if dither else "tone")
+                results[name] = measure(lambda i, tm=tm: tm.apply(wire, buf), frames)
+    vecbuf.MIN_PIXELS = saved
+    return results
+
+
+RENDER_SIZES = (8, 300, 5000)
+
+
+def strips(frames):
+    """One animated frame on 1 … 8 strips of STRIP_PIXELS, sent serially
+    and as NeoPxl8 strands: `blocked` is the transmit time per frame."""
+    import board
+    import multistrip
+
+    env = load("FinV4.py")
+    rainbow = env["mode_rainbow"]
+    results = {}
+    for count in STRIP_COUNTS:
+        for parallel in (False, True):
+            simhw.reset()
+            simhw.clock.install()
+            specs = tuple(("s{}".format(k), getattr(board, "D{}".format(5 + k)), STRIP_PIXELS) for k in range(count))
+            bus = multistrip.StripSet(specs, parallel)
+            for strip in bus.strips:
+                strip.render = rainbow
+
+            def frame(i, bus=bus):
+                bus.render(i / 60)
+                bus.flush()
+
+            key = "{}×{}px {}".format(count, STRIP_PIXELS, "parallel" if parallel else "serial")
+            results[key] = measure(frame, frames)
+    return results
+
+
+STRIP_COUNTS = (1, 2, 4, 8)
+STRIP_PIXELS = 300
+
+
+def tx(frames):
+    """Back-to-back rainbow frames on one long strip, bit-banged and sent in
+    the background (NeoPxl8, one strand). The virtual clock doesn't see
+    host CPU time, so each render is charged at DEVICE_SLOWDOWN × its host
+    time: that is the work a background transfer can hide."""
+    import board
+    import multistrip
+
+    env = load("FinV4.py")
+    rainbow = env["mode_rainbow"]
+    results = {}
+    for n in TX_SIZES:
+        for parallel in (False, True):
+            simhw.reset()
+            simhw.clock.install()
+            bus = multistrip.StripSet((("strip", board.D5, n),), parallel, timed=True)
+            strip = bus.strips[0]
+
+            def frame(i, bus=bus, strip=strip):
+                t0 = time.perf_counter()
+                rainbow(i / 60, strip.frame)
+                simhw.clock.spend((time.perf_counter() - t0) * DEVICE_SLOWDOWN)
+                strip.show(True)
+                bus.flush()
+
+            stats = measure(frame, frames)
+            stats["overlap"], stats["peak_fps"] = bus.tx_stats()[1:]
+            results["{}px {}".format(n, "background" if parallel else "blocking")] = stats
+    return results
+
+
+TX_SIZES = (300, 1000)
+DEVICE_SLOWDOWN = 50  # CircuitPython on a microcontroller vs CPython here
+
+SCRIPTS = {
+    "FinV4.py": finv4,
+    "FinV3.py": finv3,
+    "Ashton.py": ashton,
+    "render": render,
+    "strips": strips,
+    "tx": tx,
+}
+
+
+# ─────────────────────── REPORT ───────────────────────────────
+def report(results, baseline=None):
+    old = {}
+    if baseline:
+        for script, targets in baseline["scripts"].items():
+            for name, stats in targets.items():
+                old[script, name] = stats
+    for script, targets in results.items():
+        print(script)
+        for name, s in targets.items():
+            line = "  {:<26} mean {:8.1f} µs  p99 {:8.1f} µs  blocked {:8.1f} µs  alloc {:7.1f} B  {:6.1f} fps".format(
+                name, s["mean"] * 1e6, s["p99"] * 1e6, s["blocked"] * 1e6, s["alloc_peak_bytes"], s["fps"]
+            )
+            if "overlap" in s:
+                line += "  overlap {:3.0%}  peak {:6.1f} fps".format(s["overlap"], s["peak_fps"])
+            if (script, name) in old:
+                line += "  ×{:.2f}".format(s["mean"] / old[script, name]["mean"])
+            print(line)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Per-frame benchmarks on the host simulator")
+    p.add_argument("scripts", nargs="*", default=list(SCRIPTS), help="scripts to benchmark")
+    p.add_argument("--frames", type=int, default=1000, help="frames per target")
+    p.add_argument("--out", metavar="FILE", help="write the JSON report here ('-' for stdout)")
+    p.add_argument("--baseline", metavar="FILE", help="earlier JSON report to compare against")
+    args = p.parse_args(argv)
+
+    for script in args.scripts:
+        if script not in SCRIPTS:
+            p.error("no benchmarks for {} (have: {})".format(script, ", ".join(SCRIPTS)))
+    results = {s: SCRIPTS[s](args.frames) for s in args.scripts}
+    doc = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "loop_period": LOOP_PERIOD,
+        "scripts": results,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if args.out == "-":
+        json.dump(doc, sys.stdout, indent=1)
+        print()
+    else:
+        report(results, baseline)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(doc, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
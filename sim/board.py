@@ -0,0 +1,33 @@
+"""Simulated `board`: every pin name resolves to a virtual Pin."""
+
+
+class Pin:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board." + self.name
+
+
+_pins = {}
+
+
+def __getattr__(name):
+    if name.startswith("_"):
+        raise AttributeError(name)
+    pin = _pins.get(name)
+    if pin is None:
+        pin = _pins[name] = Pin(name)
+    return pin
+
+
+D0 = __getattr__("D0")
+D1 = __getattr__("D1")
+D2 = __getattr__("D2")
+D3 = __getattr__("D3")
+D4 = __getattr__("D4")
+A0 = __getattr__("A0")
+A1 = __getattr__("A1")
+A2 = __getattr__("A2")
+A3 = __getattr__("A3")
+NEOPIXEL = __getattr__("NEOPIXEL")
@@ -0,0 +1,90 @@
+"""
+Decode telemetry.py blocks back into a readable trace.
+
+    python sim/run.py Photoresistor.py --telemetry tlm.bin
+    python sim/decode.py tlm.bin
+    python sim/run.py Ashton.py | python sim/decode.py --text
+
+Input is a raw usb_cdc.data capture, console output holding TLM: hex
+lines, or a mix of both. Each record prints as `seconds  event  value`;
+seconds are unwrapped from the 2**29 ms tick counter, relative to the
+first record. --text passes the other console lines through as well.
+"""
+
+import argparse
+import binascii
+import struct
+import sys
+
+import run  # noqa: F401  (sets up sys.path for telemetry)
+import telemetry
+from telemetry import HEADER, HEADER_SIZE, HEX_PREFIX, MAGIC, RECORD, RECORD_SIZE
+
+TICKS_PERIOD = 1 << 29
+
+
+def blocks(data):
+    """Yield ("text", line) and ("block", records) from a capture, where
+    records is a list of (ticks, code, value)."""
+    prefix = HEX_PREFIX.encode()
+    pos = 0
+    while pos < len(data):
+        at = data.find(MAGIC, pos)
+        chunk = data[pos:] if at < 0 else data[pos:at]
+        for line in chunk.splitlines():
+            line = line.strip()
+            if line.startswith(prefix):
+                yield "block", _records(binascii.unhexlify(line[len(prefix) :]))
+            elif line:
+                yield "text", line.decode("utf-8", "replace")
+        if at < 0:
+            break
+        (_, n) = struct.unpack_from(HEADER, data, at)
+        end = at + HEADER_SIZE + n * RECORD_SIZE
+        yield "block", _records(data[at:end])
+        pos = end
+
+
+def _records(block):
+    magic, n = struct.unpack_from(HEADER, block, 0)
+    if magic != MAGIC:
+        raise ValueError("not a telemetry block")
+    n = min(n, (len(block) - HEADER_SIZE) // RECORD_SIZE)  # truncated capture
+    return [struct.unpack_from(RECORD, block, HEADER_SIZE + i * RECORD_SIZE) for i in range(n)]
+
+
+def decode(data, text=False, out=sys.stdout):
+    base = None  # unwrapped ms of the first record
+    last = 0
+    wraps = 0
+    for kind, item in blocks(data):
+        if kind == "text":
+            if text:
+                print(item, file=out)
+            continue
+        for ticks, code, value in item:
+            if ticks < last:
+                wraps += 1
+            last = ticks
+            ms = wraps * TICKS_PERIOD + ticks
+            if base is None:
+                base = ms
+            name = telemetry.NAMES.get(code, "code {}".format(code))
+            print("{:10.3f}  {:<14} {}".format((ms - base) / 1000, name, value), file=out)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Decode telemetry records into a trace")
+    p.add_argument("file", nargs="?", help="capture to decode (default: stdin)")
+    p.add_argument("--text", action="store_true", help="also print the console's text lines")
+    args = p.parse_args(argv)
+    if args.file:
+        with open(args.file, "rb") as f:
+            data = f.read()
+    else:
+        data = sys.stdin.buffer.read()
+    decode(data, args.text)
+
+
+if __name__ == "__main__":
+    main()
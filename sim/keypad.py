@@ -0,0 +1,104 @@
+"""
+Simulated `keypad`
+Keys samples the scripted switch signals every `interval` of virtual time,
+as the real scanner does in the background, and queues an Event with a
+ticks_ms() timestamp for every change. Scanning catches up lazily whenever
+the event queue is touched.
+"""
+
+import simhw
+
+_TICKS_MASK = (1 << 29) - 1
+
+
+class Event:
+    def __init__(self, key_number=0, pressed=True, timestamp=None):
+        self.key_number = key_number
+        self.pressed = pressed
+        self.timestamp = timestamp
+
+    @property
+    def released(self):
+        return not self.pressed
+
+    def __eq__(self, other):
+        return self.key_number == other.key_number and self.pressed == other.pressed
+
+    def __repr__(self):
+        return "<Event: key_number {} {}>".format(self.key_number, "pressed" if self.pressed else "released")
+
+
+class EventQueue:
+    def __init__(self, scanner, max_events):
+        self._scanner = scanner
+        self._events = []
+        self.max_events = max_events
+        self._overflowed = False
+
+    @property
+    def overflowed(self):
+        """Read-only, as on the device: only clear() resets it."""
+        return self._overflowed
+
+    def _put(self, key, pressed, t):
+        if len(self._events) >= self.max_events:
+            self._overflowed = True
+            return
+        self._events.append((key, pressed, int(t * 1000) & _TICKS_MASK))
+
+    def get(self):
+        event = Event()
+        return event if self.get_into(event) else None
+
+    def get_into(self, event):
+        self._scanner._scan()
+        if not self._events:
+            return False
+        event.key_number, event.pressed, event.timestamp = self._events.pop(0)
+        return True
+
+    def clear(self):
+        self._scanner._scan()
+        self._events.clear()
+        self._overflowed = False
+
+    def __len__(self):
+        self._scanner._scan()
+        return len(self._events)
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+class Keys:
+    def __init__(self, pins, *, value_when_pressed, pull=True, interval=0.02, max_events=64):
+        self.pins = tuple(pins)
+        self.value_when_pressed = value_when_pressed
+        self.interval = interval
+        self.key_count = len(self.pins)
+        self.events = EventQueue(self, max_events)
+        self._state = [False] * self.key_count
+        self._next = simhw.clock.now  # time of the next scan
+
+    def _scan(self):
+        now = simhw.clock.monotonic()
+        while self._next <= now:
+            t = self._next
+            for key, pin in enumerate(self.pins):
+                pressed = simhw.switch(pin).value(t) == self.value_when_pressed
+                if pressed != self._state[key]:
+                    self._state[key] = pressed
+                    self.events._put(key, pressed, t)
+            self._next += self.interval
+
+    def reset(self):
+        self._state = [False] * self.key_count
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
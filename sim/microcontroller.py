@@ -0,0 +1,23 @@
+"""
+Simulated `microcontroller`
+nvm is a plain bytearray that lives as long as the host process, so a
+script run twice in one process sees what the first run saved – like a
+reboot. run.py --nvm FILE also loads it from and saves it to a file.
+"""
+
+NVM_SIZE = 8192
+
+nvm = bytearray(b"\xff" * NVM_SIZE)  # erased flash reads 0xFF
+
+
+class _CPU:
+    frequency = 120000000
+    temperature = 25.0
+    voltage = 3.3
+
+
+cpu = _CPU()
+
+
+def reset():
+    raise SystemExit("microcontroller.reset()")
@@ -0,0 +1,146 @@
+"""
+Simulated `neopixel`
+Same indexing, slicing, brightness and auto_write behaviour as the
+CircuitPython pixelbuf driver. Every show() is recorded with its virtual
+timestamp in `shows` as (t, bytes) – post-brightness RGB, one 3-byte
+group per pixel – so runs can be checked frame by frame.
+"""
+
+from collections import deque
+
+import simhw
+
+RGB = "RGB"
+GRB = "GRB"
+RGBW = "RGBW"
+GRBW = "GRBW"
+
+
+class NeoPixel:
+    def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
+        if bpp != 3:
+            raise NotImplementedError("simulator models RGB strips only")
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.auto_write = auto_write
+        self.pixel_order = pixel_order or GRB
+        self._buf = bytearray(n * bpp)
+        self._brightness = min(max(brightness, 0.0), 1.0)
+        self.shows = deque(maxlen=simhw.history)
+        self.show_count = 0
+        self.tx_time = n * simhw.PIXEL_TIME + simhw.LATCH_TIME  # s per show()
+        self.busy = 0.0  # s spent transmitting
+        simhw.strips[pin] = self
+
+    # ── pixelbuf surface ──────────────────────────────────────
+    def __len__(self):
+        return self.n
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        self._brightness = min(max(value, 0.0), 1.0)
+        if self.auto_write:
+            self.show()
+
+    def _color(self, value):
+        if isinstance(value, int):
+            return (value >> 16) & 255, (value >> 8) & 255, value & 255
+        if len(value) != self.bpp:
+            raise ValueError("Expected tuple of length {}, got {}".format(self.bpp, len(value)))
+        return tuple(int(c) & 255 for c in value)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            idx = range(*index.indices(self.n))
+            if isinstance(value, (bytes, bytearray, memoryview)) and idx.step == 1:
+                if len(value) != len(idx) * self.bpp:
+                    raise ValueError(
+                        "Unmatched number of items on RHS (expected {}, got {}).".format(len(idx), len(value))
+                    )
+                self._buf[idx.start * self.bpp : idx.stop * self.bpp] = value  # flat frame
+                if self.auto_write:
+                    self.show()
+                return
+            values = list(value)
+            if len(values) == len(idx) * self.bpp and (not values or isinstance(values[0], int)):
+                # flattened r, g, b, r, g, b, … (e.g. a bytearray frame)
+                values = [tuple(values[k : k + self.bpp]) for k in range(0, len(values), self.bpp)]
+            if len(values) != len(idx):
+                raise ValueError(
+                    "Unmatched number of items on RHS (expected {}, got {}).".format(len(idx), len(values))
+                )
+            for i, v in zip(idx, values):
+                self._set(i, v)
+        else:
+            if index < 0:
+                index += self.n
+            if not 0 <= index < self.n:
+                raise IndexError("index out of range")
+            self._set(index, value)
+        if self.auto_write:
+            self.show()
+
+    def _set(self, i, value):
+        r, g, b = self._color(value)
+        j = i * self.bpp
+        self._buf[j] = r
+        self._buf[j + 1] = g
+        self._buf[j + 2] = b
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.n))]
+        if index < 0:
+            index += self.n
+        if not 0 <= index < self.n:
+            raise IndexError("index out of range")
+        j = index * self.bpp
+        return tuple(self._buf[j : j + self.bpp])
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+    def fill(self, color):
+        r, g, b = self._color(color)
+        for j in range(0, len(self._buf), self.bpp):
+            self._buf[j] = r
+            self._buf[j + 1] = g
+            self._buf[j + 2] = b
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        if self._brightness < 1.0:
+            k = self._brightness
+            wire = bytes(int(c * k) for c in self._buf)
+        else:
+            wire = self._buf
+        if simhw.recording:
+            self.shows.append((simhw.clock.now, bytes(wire)))
+        self.show_count += 1
+        self.busy += self.tx_time
+        simhw.clock.spend(self.tx_time)
+
+    def deinit(self):
+        simhw.strips.pop(self.pin, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+    # ── simulator helpers ─────────────────────────────────────
+    @property
+    def last(self):
+        """Pixels as last shown, list of (r, g, b)."""
+        if not self.shows:
+            return [(0, 0, 0)] * self.n
+        wire = self.shows[-1][1]
+        return [tuple(wire[j : j + 3]) for j in range(0, len(wire), 3)]
@@ -0,0 +1,188 @@
+"""
+Run a controller script on the host against the simulated hardware.
+
+    python sim/run.py FinV4.py --seconds 20 \\
+        --analog A2=0:20000,2:5000 --press D4=5,7.1 --hold D1=12-15
+
+The script runs unmodified: `board`, `digitalio`, `analogio` and `neopixel`
+resolve to the stand-ins in this directory and time.monotonic()/sleep()
+follow a virtual clock. The run ends once the clock passes --seconds, then
+every strip's show() history is summarised (or dumped with --dump).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def install_path():
+    """Put the stand-ins ahead of anything installed, then the repo root."""
+    for path in (ROOT, HERE):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+
+
+install_path()
+
+import simhw  # noqa: E402  (needs the path above)
+
+
+def virtual_event_loop():
+    """asyncio loop whose waits advance the virtual clock instead of
+    blocking, so asyncio scripts run on simulated time too."""
+    import asyncio
+    import selectors
+
+    class VirtualSelector(selectors.DefaultSelector):
+        def select(self, timeout=None):
+            if timeout:
+                simhw.clock.sleep(timeout)  # ends the run once time is up
+            return super().select(0)
+
+    class Policy(asyncio.DefaultEventLoopPolicy):
+        def new_event_loop(self):
+            return asyncio.SelectorEventLoop(VirtualSelector())
+
+    asyncio.set_event_loop_policy(Policy())
+
+
+def script_path(script):
+    if os.path.exists(script):
+        return os.path.abspath(script)
+    return os.path.join(ROOT, script)
+
+
+def run(script, seconds=None, name="__main__"):
+    """Execute `script` under the current simhw clock until it passes
+    `seconds` (virtual). Returns the script's globals, also when it was
+    stopped, so callers can inspect its state."""
+    path = script_path(script)
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+    env = {"__name__": name, "__file__": path}
+    virtual_event_loop()
+    clock = simhw.clock
+    if seconds is not None:
+        clock.until = clock.now + seconds
+    with clock:
+        try:
+            exec(code, env)
+        except simhw.StopSimulation:
+            pass
+    return env
+
+
+def load(script):
+    """Import `script` for its definitions only: it runs up to its first
+    sleep(), which is where every controller here enters its main loop."""
+    clock = simhw.clock
+    clock.until = None  # set-up may spend time on peripherals; only a sleep stops it
+    clock.stop_after = clock.sleeps + 1
+    try:
+        return run(script, name=os.path.splitext(os.path.basename(script))[0])
+    finally:
+        clock.stop_after = None
+
+
+# ─────────────────────── CLI ──────────────────────────────────
+def _pin(name):
+    import board
+
+    return getattr(board, name)
+
+
+def _split(spec):
+    pin, _, rest = spec.partition("=")
+    return _pin(pin.strip()), [p for p in rest.split(",") if p]
+
+
+def configure(args):
+    for spec in args.analog:
+        pin, steps = _split(spec)
+        simhw.analog(pin).script([(float(t), int(v)) for t, v in (s.split(":") for s in steps)])
+    for spec in args.press:
+        pin, times = _split(spec)
+        for t in times:
+            simhw.switch(pin).press(float(t), args.press_len)
+    for spec in args.hold:
+        pin, spans = _split(spec)
+        for span in spans:
+            start, _, end = span.partition("-")
+            simhw.switch(pin).hold(float(start), float(end) if end else None)
+
+
+def summary():
+    for pin, strip in simhw.strips.items():
+        shows = strip.shows
+        print("strip {}: {} px, {} show(), {:.3f} s transmitting".format(pin, strip.n, strip.show_count, strip.busy), end="")
+        if shows:
+            print(", t = {:.3f} … {:.3f} s".format(shows[0][0], shows[-1][0]), end="")
+        print()
+        print("  last frame:", strip.last)
+
+
+def dump(path):
+    with open(path, "w") as f:
+        for pin, strip in simhw.strips.items():
+            for t, wire in strip.shows:
+                f.write(json.dumps({"pin": repr(pin), "t": round(t, 6), "rgb": wire.hex()}) + "\n")
+
+
+def nvm_load(path):
+    import microcontroller
+
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read(len(microcontroller.nvm))
+        microcontroller.nvm[: len(data)] = data
+
+
+def nvm_save(path):
+    import microcontroller
+
+    with open(path, "wb") as f:
+        f.write(microcontroller.nvm)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    p.add_argument("script", help="controller script, e.g. FinV4.py")
+    p.add_argument("--seconds", type=float, default=10.0, help="virtual run time")
+    p.add_argument("--speed", type=float, default=0, help="× real time, 0 = as fast as possible")
+    p.add_argument("--analog", action="append", default=[], metavar="PIN=T:V,…", help="analog input steps")
+    p.add_argument("--press", action="append", default=[], metavar="PIN=T,…", help="momentary presses")
+    p.add_argument("--press-len", type=float, default=0.05, help="press duration, s")
+    p.add_argument("--hold", action="append", default=[], metavar="PIN=T0-T1,…", help="switch closed spans")
+    p.add_argument("--history", type=int, default=None, help="show() records kept per strip")
+    p.add_argument("--dump", metavar="FILE", help="write every show() as JSON lines")
+    p.add_argument("--nvm", metavar="FILE", help="load microcontroller.nvm from / save it to FILE")
+    p.add_argument("--telemetry", metavar="FILE", help="capture usb_cdc.data (telemetry blocks) to FILE")
+    args = p.parse_args(argv)
+
+    simhw.history = args.history
+    simhw.reset(speed=args.speed)
+    configure(args)
+    if args.nvm:
+        nvm_load(args.nvm)
+    if args.telemetry:
+        import usb_cdc
+
+        usb_cdc.data = open(args.telemetry, "wb")
+    run(args.script, args.seconds)
+    if args.telemetry:
+        usb_cdc.data.close()
+        usb_cdc.data = None
+    if args.nvm:
+        nvm_save(args.nvm)
+    summary()
+    if args.dump:
+        dump(args.dump)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Host-side hardware simulator – shared state
+The board/digitalio/analogio/neopixel stand-ins in this directory all talk
+to the objects here: a virtual clock, scriptable input signals per pin and
+a record of every NeoPixel show().
+"""
+
+import time
+
+_real_monotonic = time.monotonic
+_real_sleep = time.sleep
+
+
+class StopSimulation(BaseException):
+    """Raised out of time.sleep() once the virtual clock passes `until`.
+    BaseException so a script's `except Exception` can't swallow it."""
+
+
+# ─────────────────────── CLOCK ────────────────────────────────
+class VirtualClock:
+    """Replaces time.monotonic()/time.sleep() while installed.
+    speed=0 runs as fast as the host can (sleep just advances the clock),
+    speed=k runs k× faster than real time. Code between sleeps is charged
+    its real elapsed time × k, so slow loops still look slow."""
+
+    def __init__(self, speed=0, start=0.0, until=None):
+        self.speed = speed
+        self.now = start
+        self.until = until
+        self.sleeps = 0
+        self.stop_after = None  # end the run at this many sleeps
+        self._mark = None
+        self._saved = None
+
+    def monotonic(self):
+        self._charge()
+        return self.now
+
+    def monotonic_ns(self):
+        return int(self.monotonic() * 1e9)
+
+    def sleep(self, seconds):
+        self._charge()
+        self.sleeps += 1
+        if seconds > 0:
+            if self.speed:
+                _real_sleep(seconds / self.speed)
+            self.now += seconds
+        self._mark = _real_monotonic()
+        if self.until is not None and self.now >= self.until:
+            raise StopSimulation(self.now)
+        if self.stop_after is not None and self.sleeps >= self.stop_after:
+            raise StopSimulation(self.now)
+
+    def spend(self, seconds):
+        """Time a simulated peripheral blocks the CPU for (e.g. a strip
+        transmission). Also ends the run, so loops that never sleep stop."""
+        self._charge()
+        if self.speed:
+            _real_sleep(seconds / self.speed)
+        self.now += seconds
+        self._mark = _real_monotonic()
+        if self.until is not None and self.now >= self.until:
+            raise StopSimulation(self.now)
+
+    def _charge(self):
+        if self.speed and self._mark is not None:
+            t = _real_monotonic()
+            self.now += (t - self._mark) * self.speed
+            self._mark = t
+
+    def install(self):
+        self._saved = (time.monotonic, time.sleep, getattr(time, "monotonic_ns", None))
+        time.monotonic = self.monotonic
+        time.sleep = self.sleep
+        time.monotonic_ns = self.monotonic_ns
+        self._mark = _real_monotonic()
+        return self
+
+    def uninstall(self):
+        if self._saved:
+            time.monotonic, time.sleep, ns = self._saved
+            if ns is not None:
+                time.monotonic_ns = ns
+            self._saved = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+
+clock = VirtualClock()
+
+
+def now():
+    return clock.now
+
+
+# ─────────────────────── INPUTS ───────────────────────────────
+class Signal:
+    """A scripted input: piecewise-constant steps [(t, value), …] sorted by
+    time, or an arbitrary function of virtual time."""
+
+    def __init__(self, default):
+        self.default = default
+        self.steps = []
+        self.func = None
+        self.reads = 0
+
+    def set(self, value, at=None):
+        """Hold `value` from time `at` (default: now) on."""
+        at = clock.now if at is None else at
+        self.steps = [s for s in self.steps if s[0] < at]
+        self.steps.append((at, value))
+        return self
+
+    def script(self, steps):
+        self.steps = sorted(steps)
+        return self
+
+    def value(self, t=None):
+        self.reads += 1
+        t = clock.now if t is None else t
+        if self.func is not None:
+            return self.func(t)
+        v = self.default
+        for at, value in self.steps:
+            if at > t:
+                break
+            v = value
+        return v
+
+
+class Switch(Signal):
+    """Digital input wired to ground, idle high with the pull-up.
+    press()/hold() drive it low for a while."""
+
+    def __init__(self):
+        super().__init__(True)
+
+    def press(self, at, duration=0.05):
+        return self.hold(at, at + duration)
+
+    def hold(self, start, end=None):
+        self.steps.append((start, False))
+        if end is not None:
+            self.steps.append((end, True))
+        self.steps.sort()
+        return self
+
+
+_signals = {}
+
+
+def _signal(pin, cls, *args):
+    sig = _signals.get(pin)
+    if sig is None:
+        sig = _signals[pin] = cls(*args)
+    return sig
+
+
+def analog(pin, default=32768):
+    """The Signal an AnalogIn on `pin` reads (16-bit, 0 … 65535)."""
+    return _signal(pin, Signal, default)
+
+
+def switch(pin):
+    """The Signal a DigitalInOut input on `pin` reads."""
+    return _signal(pin, Switch)
+
+
+# ─────────────────────── OUTPUTS ──────────────────────────────
+strips = {}  # pin → NeoPixel, registered by the neopixel stand-in
+history = None  # shows kept per strip; None keeps all
+recording = True  # False → count show()s but keep no frames (benchmarks)
+
+# WS2812 timing: 24 bits × 1.25 µs per pixel, plus the >50 µs latch
+PIXEL_TIME = 30e-6
+LATCH_TIME = 80e-6
+
+
+def strip(pin):
+    return strips[pin]
+
+
+def reset(speed=0, until=None):
+    """Fresh clock, no scripted inputs, no strips."""
+    global clock
+    clock.uninstall()
+    clock = VirtualClock(speed=speed, until=until)
+    _signals.clear()
+    strips.clear()
+    return clock
@@ -0,0 +1,9 @@
+"""Simulated `supervisor`: ticks_ms() follows the virtual clock."""
+
+import simhw
+
+_TICKS_MASK = (1 << 29) - 1
+
+
+def ticks_ms():
+    return int(simhw.clock.monotonic() * 1000) & _TICKS_MASK
@@ -0,0 +1,9 @@
+"""
+Simulated `usb_cdc`
+data is None, as on a board whose boot.py leaves the data port disabled,
+so telemetry falls back to hex lines on the console. run.py --telemetry
+FILE puts a file there instead, standing in for the host end of the port.
+"""
+
+console = None
+data = None
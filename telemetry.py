@@ -0,0 +1,124 @@
+"""
+Telemetry log
+Diagnostics go into a preallocated ring of fixed-size binary records
+(timestamp, event code, value) instead of being printed from the loop, so
+a blocking USB-serial write no longer lands in every iteration. The ring is
+flushed in bulk, on demand or when the loop is idle, to usb_cdc.data if the
+board has it enabled, otherwise as one hex line on the console.
+sim/decode.py turns either form back into a readable trace.
+"""
+
+import struct
+
+import supervisor
+
+# record: ticks_ms (wraps at 2**29), event code, signed value
+RECORD = "<IHi"
+RECORD_SIZE = struct.calcsize(RECORD)  # 10 bytes
+# block: magic, record count, then the records oldest first
+MAGIC = b"\xa5TLM"
+HEADER = "<4sH"
+HEADER_SIZE = struct.calcsize(HEADER)
+HEX_PREFIX = "TLM:"  # console form of a block
+
+# ── event codes ──────────────────────────────────────────────
+PHOTO_RAW = 1  # photocell reading, unfiltered
+PHOTO_VALUE = 2  # filtered reading
+LIGHTS = 3  # 1 on / 0 off
+OVERRIDE = 4  # override toggled to value
+PHOTOCELL = 5  # photocell control toggled to value
+SKIPPED = 8  # loop passes that changed nothing, so far
+STATE = 9  # bit field, meaning is up to the script
+
+NAMES = {
+    PHOTO_RAW: "photo-raw",
+    PHOTO_VALUE: "photo",
+    LIGHTS: "lights",
+    OVERRIDE: "override",
+    PHOTOCELL: "photocell",
+    SKIPPED: "skipped",
+    STATE: "state",
+}
+
+
+def _data_port():
+    try:
+        import usb_cdc
+
+        return usb_cdc.data  # None unless enabled in boot.py
+    except ImportError:
+        return None
+
+
+class Telemetry:
+    def __init__(self, records, high_water=None, idle_period=1.0, port=None):
+        """Ring of `records` entries. poll() flushes once it is high_water
+        full, or when idle and the last flush is idle_period old."""
+        self.buf = bytearray(records * RECORD_SIZE)
+        self.size = records
+        self.high_water = records * 3 // 4 if high_water is None else high_water
+        self.idle_period = idle_period
+        self.port = _data_port() if port is None else port
+        self.count = 0  # records waiting to be flushed
+        self.logged = 0
+        self.overwritten = 0  # records lost because nobody flushed
+        self.flushes = 0
+        self._head = 0  # next slot to write
+        self._header = bytearray(HEADER_SIZE)
+        self._last = None
+
+    def log(self, code, value=0):
+        """Append one record. No allocation; overwrites the oldest record
+        when the ring is full."""
+        struct.pack_into(RECORD, self.buf, self._head * RECORD_SIZE, supervisor.ticks_ms(), code, value)
+        self._head += 1
+        if self._head == self.size:
+            self._head = 0
+        if self.count == self.size:
+            self.overwritten += 1
+        else:
+            self.count += 1
+        self.logged += 1
+
+    def poll(self, now, idle=False):
+        """Call once per loop. Returns True if it flushed."""
+        if self.count < self.high_water:
+            if not idle or not self.count:
+                return False
+            if self._last is not None and now - self._last < self.idle_period:
+                return False
+        self._last = now
+        self.flush()
+        return True
+
+    def flush(self):
+        """Write every waiting record out as one block. Returns the number
+        of records written."""
+        n = self.count
+        if not n:
+            return 0
+        struct.pack_into(HEADER, self._header, 0, MAGIC, n)
+        start = (self._head - n) % self.size * RECORD_SIZE
+        end = start + n * RECORD_SIZE
+        view = memoryview(self.buf)
+        if end <= len(self.buf):
+            parts = (view[start:end],)
+        else:  # wrapped
+            parts = (view[start:], view[: end - len(self.buf)])
+        if self.port is not None:
+            self.port.write(self._header)
+            for part in parts:
+                self.port.write(part)
+        else:
+            import binascii
+
+            line = HEX_PREFIX + binascii.hexlify(self._header).decode()
+            for part in parts:
+                line += binascii.hexlify(part).decode()
+            print(line)
+        self.count = 0
+        self.flushes += 1
+        return n
+
+    def stats(self):
+        return self.logged, self.flushes, self.overwritten
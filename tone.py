@@ -0,0 +1,63 @@
+"""
+Gamma and brightness tables
+The output stage maps every byte of a frame through one precomputed
+256-entry table that folds gamma correction and global brightness
+together, so the driver can run at brightness 1.0 and never rescales the
+buffer itself. Gamma makes the low end of a fade perceptually even. The
+table can only hold whole levels, and the first few steps of a gamma curve
+are less than one level apart, so with dithering on, levels below
+`dither_below` also keep their fraction and are rounded up in a rotating
+share of frames, so they average out to it over time.
+"""
+
+import vecbuf
+from pixbuf import BPP
+
+
+class ToneMap:
+    def __init__(self, gamma=2.2, brightness=1.0, dither=False, dither_below=16):
+        self.lut = bytearray(256)  # level → wire byte
+        self.frac = bytearray(256)  # fraction lost by lut, in 1/256 (0 = not dithered)
+        self.dither = dither
+        self.dither_below = dither_below
+        self.dithers = False  # any non-zero fraction
+        self._phase = 0
+        self.set(gamma, brightness)
+
+    def set(self, gamma, brightness):
+        """Rebuild the tables (floats, config time only)."""
+        self.gamma = gamma
+        self.brightness = brightness
+        for v in range(256):
+            x = (v / 255) ** gamma * brightness * 255
+            hi = min(int(x), 255)
+            self.lut[v] = hi
+            f = int((x - hi) * 256) if self.dither and hi < self.dither_below else 0
+            self.frac[v] = min(f, 255)
+        self.dithers = any(self.frac)
+
+    def apply(self, dst, src):
+        """dst = table(src), in one pass. Returns True if some byte was
+        dithered, i.e. the frame should go out again even unchanged."""
+        if not self.dithers:
+            if vecbuf.vector(len(src) // BPP):
+                vecbuf.translate(dst, src, self.lut)  # one array pass, no new buffer
+            else:
+                lut = self.lut
+                for i in range(len(src)):
+                    dst[i] = lut[src[i]]
+            return False
+        # the threshold steps through all 256 values over 256 frames (167
+        # is odd), offset per byte so neighbours don't flicker in step
+        self._phase = phase = (self._phase + 167) & 255
+        lut, frac = self.lut, self.frac
+        dithered = False
+        for i in range(len(src)):
+            v = src[i]
+            f = frac[v]
+            if f:
+                dithered = True
+                dst[i] = lut[v] + (f > ((phase + i * 73) & 255))
+            else:
+                dst[i] = lut[v]
+        return dithered
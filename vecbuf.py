@@ -0,0 +1,98 @@
+"""
+Whole-array render backend
+The pixbuf operations, done as array operations on a view of the frame
+instead of a Python loop per pixel, for strips of hundreds or thousands of
+LEDs. Frames stay plain bytearrays, so Output, effects and pixbuf all keep
+working on them. Uses ulab's numpy on boards built with it and NumPy on
+the host. Without either, or for frames shorter than MIN_PIXELS (where the
+loop is cheaper than the array set-up), every call falls back to pixbuf.
+
+Only the subset ulab shares with NumPy is used: frombuffer views, strided
+slice assignment, in-place operators and take().
+"""
+
+import pixbuf
+from pixbuf import BPP, ONE, copy, frame, set_pixel, show  # noqa: F401  (drop-in for pixbuf)
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+MIN_PIXELS = 32  # shorter frames use the pixbuf loops
+# index dtype take() uses as is; anything else NumPy converts every call
+INDEX = None if np is None else getattr(np, "intp", np.uint16)
+
+_views = {}  # id(buf) → (buf, uint8 view)
+_scratch = {}  # frame length → (uint16, uint16) blend accumulators
+_indices = {}  # frame length → INDEX array for translate()
+
+
+def vector(num_pixels):
+    """True if frames of num_pixels go through the array path."""
+    return np is not None and num_pixels >= MIN_PIXELS
+
+
+def view(buf):
+    """uint8 array sharing buf's memory, made once per frame."""
+    entry = _views.get(id(buf))
+    if entry is None or entry[0] is not buf:
+        entry = (buf, np.frombuffer(buf, dtype=np.uint8))
+        _views[id(buf)] = entry
+    return entry[1]
+
+
+def _accumulators(size):
+    acc = _scratch.get(size)
+    if acc is None:
+        acc = (np.zeros(size, dtype=np.uint16), np.zeros(size, dtype=np.uint16))
+        _scratch[size] = acc
+    return acc
+
+
+def fill(buf, color, level=ONE):
+    if not vector(len(buf) // BPP):
+        pixbuf.fill(buf, color, level)
+        return
+    v = view(buf)
+    v[0::BPP] = (color[0] * level) >> 8
+    v[1::BPP] = (color[1] * level) >> 8
+    v[2::BPP] = (color[2] * level) >> 8
+
+
+def blend(dst, a, b, t):
+    """dst = a + (b - a) * t, with t in 8.8 fixed point (0 … ONE)."""
+    if not vector(len(dst) // BPP):
+        pixbuf.blend(dst, a, b, t)
+        return
+    acc, tmp = _accumulators(len(dst))
+    acc[:] = view(a)
+    acc *= ONE - t
+    tmp[:] = view(b)
+    tmp *= t
+    acc += tmp
+    acc >>= 8
+    view(dst)[:] = acc
+
+
+def gather(buf, lut, index):
+    """Pixel p of buf = entry index[p] of a packed colour table; index is
+    an INDEX array with one entry per pixel."""
+    n = len(buf) // BPP
+    table = view(lut).reshape((len(lut) // BPP, BPP))
+    # mode="wrap": NumPy's default "raise" copies through a temporary
+    np.take(table, index, axis=0, out=view(buf).reshape((n, BPP)), mode="wrap")
+
+
+def translate(dst, src, lut):
+    """dst[i] = lut[src[i]] for every byte (a 256-entry byte table), through
+    a reused INDEX array: bytearray.translate() would build a new buffer."""
+    index = _indices.get(len(src))
+    if index is None:
+        index = np.zeros(len(src), dtype=INDEX)
+        _indices[len(src)] = index
+    index[:] = view(src)
+    np.take(view(lut), index, out=view(dst), mode="wrap")